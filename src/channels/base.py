@@ -11,6 +11,9 @@ logger = structlog.get_logger()
 class ChannelMessage:
     """Standardized message format across channels."""
 
+    # One message is created per inbound event; slots avoid a per-instance __dict__
+    __slots__ = ("content", "user_id", "username", "channel_type", "raw_event")
+
     def __init__(
         self,
         content: str,
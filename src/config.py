@@ -46,6 +46,10 @@ class Settings(BaseSettings):
         default="redis://localhost:6379/0",
         description="Redis connection URL",
     )
+    redis_max_connections: int = Field(
+        default=64,
+        description="Size of the Redis connection pool shared by all handlers",
+    )
 
     # Application Settings
     log_level: str = Field(default="INFO", description="Logging level")
@@ -28,6 +28,7 @@ engine: AsyncEngine = create_async_engine(
         "server_settings": {
             "statement_timeout": "30000",  # 30 s per-query hard limit
             "idle_in_transaction_session_timeout": "60000",  # 60 s idle-in-txn
+            "jit": "off",  # JIT compile time dwarfs the short OLTP queries issued per message
         }
     },
 )
@@ -1,9 +1,12 @@
 """Redis connection and session cache management."""
 
+import builtins
 from typing import Any
 
 import redis.asyncio as redis
 import structlog
+from redis.asyncio.client import Pipeline
+from redis.commands.core import AsyncScript
 
 from src.config import get_settings
 
@@ -15,14 +18,23 @@ redis_client: redis.Redis | None = None
 
 
 async def init_redis() -> redis.Redis:
-    """Initialize Redis connection."""
+    """Initialize the process-wide Redis client and its bounded connection pool."""
     global redis_client
-    redis_client = redis.from_url(
+    # Blocking pool: under a burst, callers wait briefly for a free connection
+    # instead of failing with "Too many connections"
+    pool = redis.BlockingConnectionPool.from_url(
         settings.redis_url,
         encoding="utf-8",
         decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=5,
+    )
+    redis_client = redis.Redis(connection_pool=pool)
+    logger.info(
+        "redis_initialized",
+        url=settings.redis_url,
+        max_connections=settings.redis_max_connections,
     )
-    logger.info("redis_initialized", url=settings.redis_url)
     return redis_client
 
 
@@ -31,6 +43,8 @@ async def close_redis() -> None:
     global redis_client
     if redis_client:
         await redis_client.aclose()
+        # The client does not own an explicitly passed pool, so release it here
+        await redis_client.connection_pool.disconnect()
         logger.info("redis_closed")
 
 
@@ -46,6 +60,8 @@ class RedisCache:
 
     def __init__(self, client: redis.Redis):
         self.client = client
+        # Lua source -> registered Script, so each script's SHA is computed once
+        self._scripts: dict[str, AsyncScript] = {}
 
     async def get(self, key: str) -> str | None:
         """Get value from cache."""
@@ -55,9 +71,9 @@ class RedisCache:
         """Set value in cache with optional TTL."""
         return await self.client.set(key, value, ex=ttl)  # type: ignore[no-any-return]
 
-    async def delete(self, key: str) -> int:
-        """Delete key from cache."""
-        return await self.client.delete(key)  # type: ignore[no-any-return]
+    async def delete(self, *keys: str) -> int:
+        """Delete one or more keys from cache."""
+        return await self.client.delete(*keys)  # type: ignore[no-any-return]
 
     async def exists(self, key: str) -> bool:
         """Check if key exists."""
@@ -75,14 +91,39 @@ class RedisCache:
         """Get hash field value."""
         return await self.client.hget(name, key)  # type: ignore[misc, no-any-return]
 
-    async def hset(self, name: str, key: str, value: str) -> int:
-        """Set hash field value."""
-        return await self.client.hset(name, key, value)  # type: ignore[misc, no-any-return]
+    async def hset(
+        self,
+        name: str,
+        key: str | None = None,
+        value: str | None = None,
+        mapping: dict[str, str] | None = None,
+    ) -> int:
+        """Set one hash field, or several at once via *mapping* (a single HSET command)."""
+        return await self.client.hset(name, key, value, mapping=mapping)  # type: ignore[misc, no-any-return]
+
+    def pipeline(self, transaction: bool = True) -> Pipeline:
+        """Start a pipeline; queued commands are sent in one round-trip by execute()."""
+        return self.client.pipeline(transaction=transaction)
+
+    def register_script(self, script: str) -> AsyncScript:
+        """Wrap a Lua script; calling it runs EVALSHA, loading the script on first use."""
+        registered = self._scripts.get(script)
+        if registered is None:
+            registered = self._scripts[script] = self.client.register_script(script)
+        return registered
+
+    async def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        """Atomically increment an integer hash field."""
+        return await self.client.hincrby(name, key, amount)  # type: ignore[misc, no-any-return]
 
     async def hgetall(self, name: str) -> dict[str, Any]:
         """Get all hash fields."""
         return await self.client.hgetall(name)  # type: ignore[misc, no-any-return]
 
+    async def smembers(self, name: str) -> builtins.set[str]:
+        """Get all members of a set."""
+        return await self.client.smembers(name)  # type: ignore[misc, no-any-return]
+
     async def hdel(self, name: str, *keys: str) -> int:
         """Delete hash fields."""
         return await self.client.hdel(name, *keys)  # type: ignore[misc, no-any-return, arg-type]
@@ -226,6 +226,13 @@ class KubernetesClient:
         )
         return [self._pod_to_dict(p) for p in resp.items]
 
+    async def list_all_pods(self, label_selector: str | None = None) -> list[dict[str, Any]]:
+        """List pods across all namespaces with their status."""
+        resp = await self._core_v1.list_pod_for_all_namespaces(  # type: ignore[attr-defined]
+            label_selector=label_selector or "",
+        )
+        return [self._pod_to_dict(p) for p in resp.items]
+
     async def get_pod(self, name: str, namespace: str = "default") -> dict[str, Any] | None:
         """Get a single pod by name."""
         try:
@@ -562,6 +569,7 @@ class KubernetesClient:
             "namespace": pod.metadata.namespace,
             "phase": phase,
             "status": waiting_reason or phase,
+            "display_status": KubernetesClient._pod_display_status(pod),
             "ready": f"{ready_count}/{len(containers)}",
             "restarts": restart_count,
             "node": pod.spec.node_name,
@@ -569,6 +577,56 @@ class KubernetesClient:
             "age": str(pod.metadata.creation_timestamp),
         }
 
+    @staticmethod
+    def _pod_display_status(pod: Any) -> str:
+        """Return the STATUS column `kubectl get pods` would print for this pod."""
+        reason = pod.status.reason or pod.status.phase or "Unknown"
+
+        # The first init container that has not completed decides the status
+        init_statuses = pod.status.init_container_statuses or []
+        initializing = False
+        for i, ics in enumerate(init_statuses):
+            state = ics.state
+            if state and state.terminated and state.terminated.exit_code == 0:
+                continue
+            if state and state.terminated:
+                t = state.terminated
+                if t.reason:
+                    reason = f"Init:{t.reason}"
+                elif t.signal:
+                    reason = f"Init:Signal:{t.signal}"
+                else:
+                    reason = f"Init:ExitCode:{t.exit_code}"
+            elif state and state.waiting and state.waiting.reason not in (None, "PodInitializing"):
+                reason = f"Init:{state.waiting.reason}"
+            else:
+                reason = f"Init:{i}/{len(pod.spec.init_containers or init_statuses)}"
+            initializing = True
+            break
+
+        if not initializing:
+            has_running = False
+            # kubectl walks the containers backwards, so the first container's state wins
+            for cs in reversed(pod.status.container_statuses or []):
+                state = cs.state
+                if not state:
+                    continue
+                if state.waiting and state.waiting.reason:
+                    reason = state.waiting.reason
+                elif state.terminated and state.terminated.reason:
+                    reason = state.terminated.reason
+                elif state.terminated:
+                    t = state.terminated
+                    reason = f"Signal:{t.signal}" if t.signal else f"ExitCode:{t.exit_code}"
+                elif cs.ready and state.running:
+                    has_running = True
+            if reason == "Completed" and has_running:
+                reason = "Running"
+
+        if pod.metadata.deletion_timestamp:
+            reason = "Unknown" if pod.status.reason == "NodeLost" else "Terminating"
+        return str(reason)
+
     @staticmethod
     def _deployment_to_dict(d: Any) -> dict[str, Any]:
         spec = d.spec or {}
@@ -587,11 +645,24 @@ class KubernetesClient:
         conditions = node.status.conditions or []
         ready_cond = next((c for c in conditions if c.type == "Ready"), None)
         status = "Ready" if (ready_cond and ready_cond.status == "True") else "NotReady"
+        labels = node.metadata.labels or {}
+        # Same role derivation as `kubectl get nodes`
+        roles = sorted(
+            key.removeprefix("node-role.kubernetes.io/")
+            for key in labels
+            if key.startswith("node-role.kubernetes.io/")
+        )
+        if labels.get("kubernetes.io/role"):
+            roles.append(labels["kubernetes.io/role"])
+        node_info = node.status.node_info
         return {
             "name": node.metadata.name,
             "status": status,
             "unschedulable": node.spec.unschedulable or False,
-            "labels": node.metadata.labels or {},
+            "labels": labels,
+            "roles": ",".join(roles) or "<none>",
+            "version": node_info.kubelet_version if node_info else "",
+            "age": str(node.metadata.creation_timestamp),
         }
 
     @staticmethod
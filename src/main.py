@@ -43,11 +43,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
     global router, handler, mcp_manager, watchloop, approval_manager, playbook_executor
 
-    logger.info("starting_application", environment=settings.environment)
-
-    # Configure logging
+    # Configure logging first, so every logger is cached against the final config
     configure_logging(settings.log_level)
 
+    logger.info("starting_application", environment=settings.environment)
+
     # Initialise OpenTelemetry tracing (no-op when otel_enabled=False)
     if settings.otel_enabled:
         setup_tracing(settings)
@@ -244,6 +244,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Stop channel adapters
     await router.stop_all()
 
+    # Let in-flight replies finish saving before the database goes away
+    await handler.drain()
+
     # Close MCP manager and all servers
     if mcp_manager:
         await mcp_manager.stop()
@@ -64,9 +64,8 @@ class MCPClient(BaseMCPTransport):
         try:
             logger.info("starting_mcp_server", command=self.server_command)
 
-            # Prepare environment variables
-            env = os.environ.copy()
-            env.update(self.env)
+            # Only build a merged environment when overrides exist; None inherits ours
+            env = {**os.environ, **self.env} if self.env else None
 
             self.process = await asyncio.create_subprocess_exec(
                 *self.server_command,
@@ -393,6 +392,15 @@ class MCPClient(BaseMCPTransport):
         """Check if transport is connected."""
         return self.process is not None and self._initialized
 
+    @staticmethod
+    async def _drain(stream: asyncio.StreamReader | None) -> None:
+        """Read and discard a stream until EOF."""
+        if stream is None:
+            return
+        while not stream.at_eof():
+            if not await stream.read(65536):
+                break
+
     async def close(self) -> None:
         """Close the MCP server process."""
         if self.process is not None:
@@ -400,9 +408,18 @@ class MCPClient(BaseMCPTransport):
                 if self.process.stdin:
                     self.process.stdin.close()
 
-                # Wait for process to terminate (with timeout)
+                # Drain stdout/stderr while waiting so a server flushing output on
+                # exit cannot block on a full pipe and force the kill path
                 try:
-                    await asyncio.wait_for(self.process.wait(), timeout=5.0)
+                    await asyncio.wait_for(
+                        asyncio.gather(
+                            self._drain(self.process.stdout),
+                            self._drain(self.process.stderr),
+                            self.process.wait(),
+                            return_exceptions=True,
+                        ),
+                        timeout=5.0,
+                    )
                 except TimeoutError:
                     logger.warning("mcp_server_timeout_killing")
                     self.process.kill()
@@ -1,9 +1,14 @@
 """Core message handling service."""
 
 import asyncio
+import functools
+import hashlib
 import re
+import time
 import uuid
-from datetime import UTC
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine
+from datetime import UTC, datetime
+from typing import Any, cast
 
 import structlog
 
@@ -12,6 +17,7 @@ from src.channels.base import ChannelMessage
 from src.channels.router import MessageRouter
 from src.database import get_db_session
 from src.database.redis import RedisCache, get_redis
+from src.k8s import get_k8s_client
 from src.mcp.mcp_manager import MCPManager
 from src.monitoring.tracing import get_tracer
 from src.services.session_manager import SessionManager
@@ -19,6 +25,11 @@ from src.services.session_manager import SessionManager
 logger = structlog.get_logger()
 _tracer = get_tracer(__name__)
 
+# Chat command coroutine: (message, args after the command) -> reply
+_CommandHandler = Callable[[ChannelMessage, list[str]], Awaitable[str]]
+# Chat command that reads or changes the user's session: (..., session manager) -> reply
+_SessionCommandHandler = Callable[[ChannelMessage, list[str], SessionManager], Awaitable[str]]
+
 # Kubernetes keywords for detection
 K8S_KEYWORDS = [
     "pod",
@@ -104,6 +115,513 @@ SECURITY_KEYWORDS = [
 ]
 
 
+def _keyword_pattern(keywords: list[str]) -> re.Pattern[str]:
+    """
+    Compile keywords into one prefix-factored alternation for substring search.
+
+    Keywords sharing a prefix are merged into a trie ("pod"/"pods" → "pod"), so a
+    single regex scan answers "does any keyword occur" without a pass per keyword.
+    """
+    trie: dict = {}
+    for word in keywords:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        if "" in node:
+            # A shorter keyword already matches; longer continuations are redundant
+            return ""
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return re.compile(build(trie))
+
+
+_K8S_KEYWORDS_RE = _keyword_pattern(K8S_KEYWORDS)
+_SECURITY_KEYWORDS_RE = _keyword_pattern(SECURITY_KEYWORDS)
+
+# Precompiled patterns for the per-message query handlers
+_TOOL_CALL_RE = re.compile(r"TOOL_CALL:\s*(\w+)\((.*?)\)")
+# How long the MCP tools section of the system prompt is reused before re-listing tools
+_TOOLS_PROMPT_TTL = 60.0
+# key=value pairs inside a TOOL_CALL; quoted values may contain commas
+_TOOL_ARG_RE = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^,]*))""")
+
+_FOLLOWUP_RES = [
+    re.compile(
+        r"\b(show|list|get|see|display)\b.{0,30}\b(detail|details|pods?|them|all|more|everything)\b"
+    ),
+    re.compile(
+        r"^(detail|details|more info|show more|show all|list all|all of them|list them)\s*$"
+    ),
+    re.compile(
+        r"\b(can you|could you|please|pls)\b.{0,40}\b(show|list|get)\b.{0,30}\b(detail|pods?|more|all|them|everything)\b"
+    ),
+]
+_NAMESPACE_INDICATOR_RES = [
+    re.compile(r"(?:in|from|on)\s+(?:the\s+)?[a-z0-9][a-z0-9\-]+\s+namespace"),
+    re.compile(r"\bnamespace\s+[a-z0-9][a-z0-9\-]+"),
+    re.compile(r"-n\s+[a-z0-9][a-z0-9\-]+"),
+]
+
+# Namespace mentions, leftmost first. The "in/from/on" and "<name> namespace"
+# forms only look ahead at the name, so a stop-listed capture ("pods namespace
+# foo") does not swallow the "namespace foo" match that follows it.
+_NS_RE = re.compile(
+    r"(?:in|from|on)\s+(?:the\s+)?(?=([a-z0-9\-]+))"
+    r"|([a-z0-9\-]+)(?=\s+namespace)"  # "pos-order4u namespace" - name before keyword
+    r"|namespace\s+([a-z0-9\-]+)"
+    r"|-n\s+([a-z0-9\-]+)"
+)
+# Common kubernetes words the namespace patterns pick up that are not namespaces
+_NS_STOPWORDS = frozenset(
+    {
+        "pod",
+        "pods",
+        "deployment",
+        "service",
+        "node",
+        "container",
+        "namespace",
+        "the",
+        "check",
+        "show",
+        "list",
+        "get",
+        "and",
+    }
+)
+
+
+def _extract_namespace(query_lower: str) -> str | None:
+    """Return the first namespace mentioned in a lower-cased query, if any."""
+    for m in _NS_RE.finditer(query_lower):
+        # Every alternative captures exactly one group, so lastindex is always set
+        namespace = m[cast(int, m.lastindex)]
+        if namespace not in _NS_STOPWORDS:
+            return namespace
+    return None
+
+
+def _intent_pattern(intents: dict[str, tuple[str, ...]]) -> re.Pattern[str]:
+    """
+    Compile named keyword groups into one overlapping-match intent classifier.
+
+    Every alternative sits inside a lookahead, so ``finditer`` reports the
+    first-listed intent starting at *each* position and one scan yields every
+    intent present in the text. Dict order is the priority order.
+    """
+    alts = (
+        f"(?P<{name}>" + "|".join(map(re.escape, words)) + ")" for name, words in intents.items()
+    )
+    return re.compile("(?=" + "|".join(alts) + ")")
+
+
+def _match_intents(pattern: re.Pattern[str], text: str) -> set[str]:
+    """Return the names of all intent groups of *pattern* that occur in *text*."""
+    return {m.lastgroup for m in pattern.finditer(text)}  # type: ignore[misc]
+
+
+# Natural-language Kubernetes intents, in the order _handle_kubernetes_query checks them
+_K8S_INTENT_RE = _intent_pattern(
+    {
+        "fix": (
+            "fix ",
+            "fix these",
+            "fix the",
+            "fix error",
+            "fix issue",
+            "fix pod",
+            "fix crash",
+            "fix oom",
+            "clean up pod",
+            "cleanup pod",
+            "clean pod",
+            "remediat",
+            "delete error",
+            "delete failed",
+            "remove error",
+            "remove failed",
+            "resolve pod",
+        ),
+        "pods": ("pod", "container"),
+        "deployments": ("deploy",),
+        "services": ("service", "svc"),
+        "nodes": ("node", "cluster"),
+        "namespaces": ("namespace",),
+        "events": ("event", "what happened", "what's happening"),
+        "restart": ("restart",),
+        "rollback": ("rollback",),
+        "cordon": ("cordon", "drain"),
+        "crashloop": ("crashloop", "crashing", "oom"),
+        "fix_any": ("fix", "clean", "remediat", "repair"),
+    }
+)
+
+# Status-filter words in pod listings, in priority order
+_POD_STATUS_FILTER_RE = _intent_pattern(
+    {
+        "problem": ("error", "failed", "failing", "crash"),
+        "notready": ("unhealthy", "not ready", "notready"),
+        "pending": ("pending",),
+        "running": ("running", "healthy", "ready"),
+        "all": ("all", "detail", "everything", "full"),
+    }
+)
+# status_filter → description appended to the response title
+_POD_STATUS_FILTER_LABELS = {
+    "problem": " with issues",
+    "notready": " not ready",
+    "pending": " pending",
+    "running": " running",
+    "all": "",
+}
+
+# Word-number normalisation ("one replica" → "1 replica")
+_WORD_NUMS = {
+    "zero": "0",
+    "one": "1",
+    "two": "2",
+    "three": "3",
+    "four": "4",
+    "five": "5",
+    "six": "6",
+    "seven": "7",
+    "eight": "8",
+    "nine": "9",
+    "ten": "10",
+}
+_WORD_NUM_RE = re.compile(r"\b(" + "|".join(_WORD_NUMS) + r")\b")
+
+_REPLICA_COUNT_RE = re.compile(r"(\d+)\s+replica")
+_SCALE_NAME_RE = re.compile(r"(?:scale\s+(?:down\s+|up\s+)?|resize\s+)([a-z0-9][a-z0-9\-\.]+)")
+_SCALE_NAME_FALLBACK_RE = re.compile(
+    r"([a-z0-9][a-z0-9\-\.]{3,})(?:\s+(?:pod|deployment|app|service))?\s+(?:to\s+)?\d+\s+replica"
+)
+_POD_NAME_RE = re.compile(r"(?:pod|container)\s+(\S+)")
+_DEPLOY_NAME_RE = re.compile(r"(?:deployment|deploy)\s+(\S+)")
+_REPLICA_RE = re.compile(r"(?:to\s+)?(\d+)\s+(?:replica|replicas|instance)")
+_RESTART_POD_RE = re.compile(r"restart\s+(?:pod\s+)?(\S+)")
+_RESTART_DEPLOY_RE = re.compile(r"restart\s+(?:deployment\s+)?(\S+)")
+_ROLLBACK_RE = re.compile(r"rollback\s+(?:deployment\s+)?(\S+)")
+_REVISION_RE = re.compile(r"to\s+revision\s+(\d+)")
+_NODE_ACTION_RE = re.compile(r"(?:cordon|uncordon|drain)\s+(?:node\s+)?(\S+)")
+
+# Security query patterns (simplePortChecker tools)
+# 1. Port scanning: "is port 443 open on lobehub.com"
+_PORT_RE = re.compile(r"port\s+(\d+)\s+(?:open\s+)?(?:on|at|for)\s+([a-zA-Z0-9\.\-]+)")
+# Patterns 2-7 are written without adjacent optional whitespace runs (the old
+# "verb?\s*noun\s+(?:for|on)?\s+" shape), which backtracked polynomially on long
+# whitespace in user messages. "(?:\s+prep\s+|\s\s+)" accepts the same strings as
+# "\s+(?:prep)?\s+" in linear time; leading optional verbs never affected the
+# captured host, so they are dropped.
+# 2. Certificate check: "check certificate for lobehub.com", "ssl cert on example.com"
+_CERT_RE = re.compile(r"(?:cert|certificate)(?:\s+(?:for|on|of)\s+|\s\s+)([a-zA-Z0-9\.\-]+)")
+# 3. WAF/CDN detection: "check waf on example.com", "detect cdn for site.com"
+_WAF_RE = re.compile(
+    r"(?:waf|cdn|cloudflare|protection|firewall)(?:\s+(?:for|on)\s+|\s\s+)([a-zA-Z0-9\.\-]+)"
+)
+# 4. mTLS check: "check mtls on api.example.com"
+_MTLS_RE = re.compile(r"mtls(?:\s+(?:for|on)\s+|\s\s+)([a-zA-Z0-9\.\-]+)")
+# 5. Security headers: "check security headers for example.com"
+_HEADERS_RE = re.compile(r"headers(?:\s+(?:for|on)\s+|\s\s+)([a-zA-Z0-9\.\-]+)")
+# 6. OWASP scan: "scan owasp vulnerabilities on example.com"
+_OWASP_RE = re.compile(
+    r"owasp(?:\s+vulnerabilities|\s)(?:\s+(?:for|on)\s+|\s\s+)([a-zA-Z0-9\.\-]+)"
+)
+# 7. Full security scan: "full security scan on example.com", "security assessment for site.com"
+_FULL_SCAN_RE = re.compile(
+    r"security\s+(?:scan|assessment|check)(?:\s+(?:for|on)\s+|\s\s+)([a-zA-Z0-9\.\-]+)"
+)
+
+# Security intents in routing priority order: (pattern, MCP tool, result title).
+# Each pattern's last group is the target host; _PORT_RE also captures the port.
+_SECURITY_ROUTES = (
+    (_PORT_RE, "scan_ports", "🔌 Port Scan"),
+    (_CERT_RE, "analyze_certificate", "🔒 Certificate Analysis"),
+    (_WAF_RE, "detect_l7_protection", "🛡️ WAF/CDN Detection"),
+    (_MTLS_RE, "check_mtls", "🔐 mTLS Check"),
+    (_HEADERS_RE, "check_security_headers", "📋 Security Headers"),
+    (_OWASP_RE, "scan_owasp_vulnerabilities", "🔍 OWASP Vulnerability Scan"),
+    (_FULL_SCAN_RE, "full_security_scan", "🔎 Full Security Assessment"),
+)
+
+# Static help replies; only the security tool list varies between calls
+_SECURITY_HELP_TEMPLATE = """🔧 **Security Tools Available**
+
+I have {tool_count} security tools from SimplePortChecker:
+
+**Port Scanning:**
+• "is port 443 open on example.com"
+• "scan ports on example.com"
+
+**Certificate Analysis:**
+• "check certificate for example.com"
+• "analyze ssl cert on example.com"
+
+**WAF/CDN Detection:**
+• "detect waf on example.com"
+• "check cloudflare protection for site.com"
+
+**mTLS Verification:**
+• "check mtls on api.example.com"
+
+**Security Headers:**
+• "check security headers for example.com"
+• "scan headers on site.com"
+
+**OWASP Scanning:**
+• "scan owasp vulnerabilities on example.com"
+
+**Full Security Assessment:**
+• "full security scan on example.com"
+• "comprehensive security assessment for site.com"
+
+**Available Tools:** {tool_names}"""
+
+
+@functools.lru_cache(maxsize=4)
+def _security_help(tool_names: tuple[str, ...]) -> str:
+    """Render the security help message for the given SimplePortChecker tool names."""
+    return _SECURITY_HELP_TEMPLATE.format(
+        tool_count=len(tool_names), tool_names=", ".join(tool_names)
+    )
+
+
+_K8S_HELP = """🔧 Kubernetes Commands
+
+Pod Management:
+• /k8s pods - List all pods
+• /k8s pods <namespace> - List pods in namespace
+• /k8s fix - Auto-remediate Error/CrashLoop/OOMKilled pods (all namespaces)
+• /k8s fix <namespace> - Fix problem pods in a specific namespace
+• /k8s describe pod <name> [namespace] - Get pod details
+• /k8s logs <pod-name> [namespace] - Get pod logs
+• /k8s top pods - Show pod resource usage
+
+Deployment Management:
+• /k8s deployments [namespace] - List deployments
+• /k8s scale <deployment> <replicas> [namespace] - Scale deployment
+• /k8s rollout status <deployment> [namespace] - Check rollout status
+
+Service Management:
+• /k8s services [namespace] - List services
+• /k8s endpoints [namespace] - List endpoints
+
+Node Management:
+• /k8s nodes - List nodes
+• /k8s top nodes - Show node resource usage
+• /k8s describe node <name> - Get node details
+
+Namespace Management:
+• /k8s namespaces - List all namespaces
+
+Helm:
+• /k8s helm list - List Helm releases
+• /k8s helm status <release> - Get Helm release status
+
+Events & Logs:
+• /k8s events [namespace] - Show recent events
+• /k8s logs <pod> [namespace] - Get pod logs
+
+Configuration:
+• /k8s contexts - List available contexts
+• /k8s config - View current configuration
+
+Examples:
+  /k8s pods production
+  /k8s logs nginx-abc123 production
+  /k8s scale api-server 5 production
+  /k8s nodes
+  /k8s deployments
+
+Note: Kubernetes MCP tools are integrated. You can manage your cluster directly from this chat!
+"""
+
+# Pod status → chat emoji; statuses not listed fall back to ✅ (Running) or ⚠️
+_POD_STATUS_EMOJI = {
+    "CrashLoopBackOff": "❌",
+    "Error": "❌",
+    "ImagePullBackOff": "❌",
+    "ErrImagePull": "❌",
+    "Pending": "⏳",
+    "ContainerCreating": "⏳",
+    "Completed": "✔️",
+    "OOMKilled": "💥",
+}
+
+
+def _format_pod_row(parts: list[str], has_ns_col: bool) -> str:
+    """Format one split `kubectl get pods` row for chat display."""
+    if has_ns_col:
+        ns, name, ready, status, restarts, age = parts[:6]
+        name_label = f"`{ns}/{name}`"
+    else:
+        name, ready, status, restarts, age = parts[:5]
+        name_label = f"**{name}**"
+    status_emoji = _POD_STATUS_EMOJI.get(status) or (
+        "✅" if status == "Running" and "/" in ready else "⚠️"
+    )
+    return (
+        f"{status_emoji} {name_label}\n"
+        f"   Status: {status} | Ready: {ready} | Restarts: {restarts} | Age: {age}"
+    )
+
+
+def _resource_age(created: str) -> str:
+    """Render a pod or node creation timestamp as a kubectl-style age ("45s", "12m", "5h", "3d")."""
+    try:
+        seconds = int((datetime.now(UTC) - datetime.fromisoformat(created)).total_seconds())
+    except (TypeError, ValueError):
+        return "<unknown>"
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit}"
+    return f"{max(seconds, 0)}s"
+
+
+def _pod_dict_to_row(pod: dict, with_namespace: bool) -> str:
+    """Render a KubernetesClient pod dict as a `kubectl get pods` style row."""
+    cols = [
+        pod["name"],
+        pod["ready"],
+        pod["display_status"],
+        str(pod["restarts"]),
+        _resource_age(pod["age"]),
+    ]
+    if with_namespace:
+        cols.insert(0, pod["namespace"])
+    return "   ".join(cols)
+
+
+def _node_dict_to_row(node: dict) -> str:
+    """Render a KubernetesClient node dict as a `kubectl get nodes` style row."""
+    status = f"{node['status']},SchedulingDisabled" if node["unschedulable"] else node["status"]
+    cols = [node["name"], status, node["roles"], _resource_age(node["age"]), node["version"] or "-"]
+    return "   ".join(cols)
+
+
+# Short-lived Redis cache for read-only kubectl output, so users asking the same
+# question seconds apart share one subprocess + API round-trip
+_KUBECTL_CACHE_TTL = 10
+# Hard stop for a hung kubectl (unreachable API server); above drain's own --timeout=120s
+_KUBECTL_TIMEOUT = 180
+# Upper bound on kubectl processes spawned at once by commands that fan out
+_KUBECTL_MAX_PARALLEL = 8
+_KUBECTL_CACHEABLE_VERBS = frozenset({"get", "logs"})
+# Verbs that change cluster state; running one drops every cached read
+_KUBECTL_MUTATING_VERBS = frozenset(
+    {
+        "annotate",
+        "apply",
+        "autoscale",
+        "cordon",
+        "create",
+        "delete",
+        "drain",
+        "edit",
+        "expose",
+        "label",
+        "patch",
+        "replace",
+        "rollout",
+        "run",
+        "scale",
+        "set",
+        "taint",
+        "uncordon",
+    }
+)
+# Redis set of the cached kubectl keys, so a mutation can drop them all at once
+_KUBECTL_CACHE_INDEX = "kubectl:keys"
+
+
+def _kubectl_cache_key(args: list[str]) -> str | None:
+    """Return the Redis key for cacheable kubectl args, or None for mutating verbs."""
+    if not args or args[0] not in _KUBECTL_CACHEABLE_VERBS:
+        return None
+    digest = hashlib.blake2b(b"\0".join(a.encode() for a in args), digest_size=16)
+    return f"kubectl:{digest.hexdigest()}"
+
+
+# Pod logs shown in chat are cut to their last _LOG_TAIL_LINES lines. kubectl is
+# asked for one extra line so we can tell whether anything was cut.
+_LOG_TAIL_LINES = 50
+_LOG_TAIL_ARG = f"--tail={_LOG_TAIL_LINES + 1}"
+
+
+def _tail_lines(text: str, n: int = _LOG_TAIL_LINES) -> str:
+    """Return the last *n* lines of *text*, noting when earlier lines were dropped."""
+    # Walk back over n newlines instead of splitting the whole text
+    idx = len(text)
+    for _ in range(n):
+        idx = text.rfind("\n", 0, idx)
+        if idx < 0:
+            return text
+    return f"{text[idx + 1 :]}\n\n(Showing last {n} lines, earlier lines omitted)"
+
+
+# `kubectl config view` fields shown by /k8s config: current context, then all context names
+_KUBECONFIG_SUMMARY_JSONPATH = 'jsonpath={.current-context}{"\\n"}{.contexts[*].name}'
+
+# Statuses that mark a pod as needing attention in the default pods summary
+_BAD_POD_STATUSES = (
+    "Error",
+    "CrashLoopBackOff",
+    "ImagePullBackOff",
+    "ErrImagePull",
+    "Pending",
+    "Failed",
+    "Unknown",
+    "Terminating",
+    "ContainerCreating",
+    "OOMKilled",
+)
+_BAD_POD_STATUS_RE = re.compile("|".join(_BAD_POD_STATUSES))
+# Statuses listed by the "crashloop / oom" query
+_CRASHLOOP_STATUS_RE = re.compile(r"CrashLoopBackOff|Error|OOMKilled|ImagePullBackOff")
+# Statuses _fix_problem_pods treats as degraded (substring match on the STATUS column)
+_DEGRADED_STATUS_RE = re.compile(
+    r"Error|Failed|CrashLoopBackOff|OOMKilled|ImagePullBackOff|ErrImagePull|InvalidImageName"
+)
+# Deletable statuses: the controller recreates the pod
+_DELETABLE_POD_STATUSES = frozenset(
+    {"Error", "Failed", "Completed", "OOMKilled", "CrashLoopBackOff", "Unknown"}
+)
+# Resource kinds `kubectl describe` must not be given a namespace for
+_CLUSTER_SCOPED_RESOURCES = frozenset({"node", "nodes", "namespace", "namespaces"})
+_NOT_READY_STATUS_RE = re.compile(r"Pending|Error|CrashLoop")
+_PENDING_STATUS_RE = re.compile(r"Pending|ContainerCreating")
+# READY column, e.g. "1/2" — the only whitespace-delimited N/M token in a pods row
+_READY_COL_RE = re.compile(r"(?<!\S)(\d+)/(\d+)(?!\S)")
+
+
+def _pod_degraded(line: str) -> bool:
+    """Return True if the row's READY column shows fewer ready containers than total."""
+    m = _READY_COL_RE.search(line)
+    return m is not None and m[1] != m[2]
+
+
+def _pod_line_matches(line: str, status_filter: str) -> bool:
+    """Check whether a `kubectl get pods` row passes the requested status filter."""
+    if status_filter == "problem":
+        # Bad status anywhere in the row, or Running with some containers not ready
+        return bool(_BAD_POD_STATUS_RE.search(line)) or ("Running" in line and _pod_degraded(line))
+    if status_filter == "notready":
+        return (
+            "Running" not in line or bool(_NOT_READY_STATUS_RE.search(line)) or _pod_degraded(line)
+        )
+    if status_filter == "pending":
+        return bool(_PENDING_STATUS_RE.search(line))
+    if status_filter == "running":
+        # All containers must be ready
+        m = _READY_COL_RE.search(line) if "Running" in line else None
+        return m is not None and m[1] == m[2]
+    return status_filter == "all"
+
+
 class MessageHandler:
     """Handles incoming messages and orchestrates responses."""
 
@@ -117,25 +635,76 @@ class MessageHandler:
         self.ai_client = ai_client
         self.mcp_manager = mcp_manager
         self.approval_manager = None  # Set by main.py after AIOps init
+        # (built_at, text) of the MCP tools system-prompt section; see _get_tools_prompt
+        self._tools_prompt_cache: tuple[float, str] | None = None
+        # channel_type -> (tools section, assembled system prompt); see _assemble_system_prompt
+        self._system_prompt_cache: dict[str, tuple[str, str]] = {}
+        # Read-only kubectl calls currently running, shared by identical concurrent requests
+        self._kubectl_inflight: dict[tuple[str, ...], asyncio.Task[tuple[bool, str]]] = {}
+        # Bumped by every mutating kubectl call; reads started before a bump aren't cached
+        self._kubectl_generation = 0
+        # Fire-and-forget tasks (e.g. _persist_turn), referenced so they are not GC'd mid-run
+        self._background_tasks: set[asyncio.Task[None]] = set()
+        # conversation_id -> its latest _persist_turn task, awaited by the next message in
+        # that conversation so turns are stored (and read back) in order
+        self._pending_turns: dict[uuid.UUID, asyncio.Task[None]] = {}
+        # Shared RedisCache wrapper; see _get_redis_cache
+        self._redis_cache: RedisCache | None = None
+        # /command -> coroutine producing the reply; see _handle_command. Commands in
+        # _commands never touch the user's session, so no DB session is opened for them.
+        self._commands: dict[str, _CommandHandler] = {
+            "/help": self._cmd_help,
+            "/k8s": self._cmd_k8s,
+            "/approval": self._cmd_approval,
+            "/incident": self._cmd_incident,
+            "/alert": self._cmd_alert,
+        }
+        self._session_commands: dict[str, _SessionCommandHandler] = {
+            "/reset": self._cmd_reset,
+            "/status": self._cmd_status,
+            "/model": self._cmd_model,
+        }
+        # /k8s <subcommand> -> coroutine taking the full argument list
+        self._k8s_dispatch: dict[str, Callable[[list[str]], Awaitable[str]]] = {
+            "pods": self._k8s_pods,
+            "nodes": self._k8s_nodes,
+            "namespaces": self._k8s_namespaces,
+            "deployments": self._k8s_deployments,
+            "services": self._k8s_services,
+            "contexts": self._k8s_contexts,
+            "logs": self._k8s_logs,
+            "scale": self._k8s_scale,
+            "events": self._k8s_events,
+            "describe": self._k8s_describe,
+            "helm": self._k8s_helm,
+            "top": self._k8s_top,
+            "config": self._k8s_config,
+            "fix": self._k8s_fix,
+        }
         logger.info(
             "message_handler_initialized",
             mcp_enabled=mcp_manager is not None,
         )
 
-    def _format_kubectl_table(self, output: str, resource_type: str = "pods") -> str:
+    def _format_kubectl_table(self, output: str | list[str], resource_type: str = "pods") -> str:
         """
         Format kubectl table output for better readability in chat.
 
         Args:
-            output: Raw kubectl output
+            output: Raw kubectl output, or its lines (header first)
             resource_type: Type of resource (pods, nodes, deployments, etc.)
 
         Returns:
             Formatted string for chat display
         """
-        lines = output.strip().split("\n")
-        if len(lines) <= 1:
-            return output
+        if isinstance(output, list):
+            lines = output
+            if len(lines) <= 1:
+                return "\n".join(lines)
+        else:
+            lines = output.strip().splitlines()
+            if len(lines) <= 1:
+                return output
 
         # Parse header and rows
         header_line = lines[0]
@@ -143,46 +712,15 @@ class MessageHandler:
 
         # For pods, show key information in a compact format
         if resource_type == "pods":
-            formatted = []
             # Detect --all-namespaces output: first column header is NAMESPACE
             has_ns_col = header_line.strip().upper().startswith("NAMESPACE")
-            for line in data_lines:
-                parts = line.split()
-                min_cols = 6 if has_ns_col else 5
-                if len(parts) >= min_cols:
-                    if has_ns_col:
-                        ns = parts[0]
-                        name = parts[1]
-                        ready = parts[2]
-                        status = parts[3]
-                        restarts = parts[4]
-                        age = parts[5]
-                    else:
-                        ns = None
-                        name = parts[0]
-                        ready = parts[1]
-                        status = parts[2]
-                        restarts = parts[3]
-                        age = parts[4]
-
-                    # Status emoji
-                    status_emoji = "✅" if status == "Running" and "/" in ready else "⚠️"
-                    if status in ["CrashLoopBackOff", "Error", "ImagePullBackOff", "ErrImagePull"]:
-                        status_emoji = "❌"
-                    elif status in ["Pending", "ContainerCreating"]:
-                        status_emoji = "⏳"
-                    elif status == "Completed":
-                        status_emoji = "✔️"
-                    elif status == "OOMKilled":
-                        status_emoji = "💥"
-
-                    name_label = f"`{ns}/{name}`" if ns else f"**{name}**"
-                    formatted.append(
-                        f"{status_emoji} {name_label}\n"
-                        f"   Status: {status} | Ready: {ready} | Restarts: {restarts} | Age: {age}"
-                    )
-
-            return "\n\n".join(formatted) if formatted else "No resources found"
+            min_cols = 6 if has_ns_col else 5
+            pod_rows = "\n\n".join(
+                _format_pod_row(parts, has_ns_col)
+                for line in data_lines
+                if len(parts := line.split()) >= min_cols
+            )
+            return pod_rows or "No resources found"
 
         # For nodes, show compact format
         elif resource_type == "nodes":
@@ -215,14 +753,9 @@ class MessageHandler:
                     available = parts[3]
                     age = parts[4] if len(parts) > 4 else "N/A"
 
-                    # Check if deployment is healthy
-                    status_emoji = "✅" if "/" in ready else "⚠️"
-                    try:
-                        current, desired = ready.split("/")
-                        if current != desired:
-                            status_emoji = "⚠️"
-                    except Exception:
-                        pass
+                    # Healthy when READY is "<n>/<n>"
+                    current, sep, desired = ready.partition("/")
+                    status_emoji = "✅" if sep and current == desired else "⚠️"
 
                     formatted.append(
                         f"{status_emoji} **{name}**\n   Ready: {ready} | Up-to-date: {up_to_date} | Available: {available} | Age: {age}"
@@ -243,16 +776,219 @@ class MessageHandler:
             formatted.append("```")
             return "\n".join(formatted)
 
-    async def _run_kubectl_command(self, args: list[str]) -> tuple[bool, str]:
+    async def _iter_kubectl_lines(
+        self, args: list[str], use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Run a kubectl command and yield its stdout line by line as it arrives.
+
+        Args:
+            args: kubectl command arguments (without 'kubectl' prefix)
+            use_cache: False to always read live state (e.g. when the result drives a change)
+
+        Yields:
+            Decoded output lines without trailing newlines
+
+        Raises:
+            RuntimeError: If kubectl is missing, exits with a non-zero status or times out
+        """
+        cache_key = _kubectl_cache_key(args) if use_cache else None
+        if cache_key:
+            cached = await self._get_cached_kubectl_output(cache_key)
+            if cached is not None:
+                for line in cached.splitlines():
+                    yield line
+                return
+
+        generation = self._kubectl_generation
+        cmd = ["kubectl"] + args
+        logger.info("running_kubectl", command=" ".join(cmd), streaming=True)
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            logger.error("kubectl_not_found")
+            raise RuntimeError(
+                "kubectl command not found. Please ensure kubectl is installed and in your PATH."
+            ) from None
+
+        # Both streams exist because they were requested as PIPE above
+        stdout = cast(asyncio.StreamReader, process.stdout)
+        stderr_stream = cast(asyncio.StreamReader, process.stderr)
+        # Collect stderr concurrently so a chatty stderr can never stall stdout
+        stderr_task = asyncio.create_task(stderr_stream.read())
+        seen: list[str] = []
+        # Bound each read by what is left of the overall deadline rather than wrapping
+        # the loop, so time spent by the consumer between yields is never cancelled
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _KUBECTL_TIMEOUT
+        try:
+            while raw := await asyncio.wait_for(stdout.readline(), timeout=deadline - loop.time()):
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                if cache_key:
+                    seen.append(line)
+                yield line
+            await asyncio.wait_for(process.wait(), timeout=deadline - loop.time())
+        except TimeoutError:
+            logger.error("kubectl_command_timeout", command=" ".join(cmd), streaming=True)
+            raise RuntimeError(f"kubectl did not finish within {_KUBECTL_TIMEOUT}s") from None
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stderr = await stderr_task
+
+        if process.returncode != 0:
+            error = stderr.decode("utf-8", errors="replace").strip()
+            logger.error("kubectl_command_failed", error=error, returncode=process.returncode)
+            raise RuntimeError(error)
+
+        if cache_key:
+            await self._cache_kubectl_output(cache_key, "\n".join(seen), generation)
+
+    async def _iter_pod_rows(self, namespace: str | None) -> AsyncIterator[str]:
+        """
+        Yield `kubectl get pods` style rows (header first) for a namespace or the whole cluster.
+
+        Uses the shared in-process Kubernetes API client, whose HTTP session and TLS
+        connection persist across queries, and falls back to a kubectl subprocess
+        when no cluster config could be loaded.
+
+        Args:
+            namespace: Namespace to list, or None for all namespaces
+
+        Yields:
+            Header line followed by one line per pod
+
+        Raises:
+            RuntimeError: If the API request or kubectl fails
+        """
+        k8s = await get_k8s_client()
+        if not k8s.is_available:
+            kubectl_args = ["get", "pods", "-o", "wide"]
+            kubectl_args += ["-n", namespace] if namespace else ["--all-namespaces"]
+            async for line in self._iter_kubectl_lines(kubectl_args):
+                yield line
+            return
+
+        try:
+            pods = await (k8s.list_pods(namespace) if namespace else k8s.list_all_pods())
+        except Exception as e:
+            logger.error("k8s_list_pods_failed", namespace=namespace, error=str(e))
+            raise RuntimeError(getattr(e, "reason", None) or str(e)) from e
+
+        with_namespace = namespace is None
+        header = "NAME   READY   STATUS   RESTARTS   AGE"
+        yield f"NAMESPACE   {header}" if with_namespace else header
+        for pod in pods:
+            yield _pod_dict_to_row(pod, with_namespace)
+
+    def _get_redis_cache(self) -> RedisCache:
+        """Return the shared RedisCache, re-wrapping it if the Redis client was re-initialised."""
+        client = get_redis()
+        if self._redis_cache is None or self._redis_cache.client is not client:
+            self._redis_cache = RedisCache(client)
+        return self._redis_cache
+
+    async def _get_cached_kubectl_output(self, cache_key: str) -> str | None:
+        """Return cached kubectl output, or None on a miss or when Redis is unavailable."""
+        try:
+            return await self._get_redis_cache().get(cache_key)
+        except Exception as e:
+            logger.debug("kubectl_cache_get_failed", error=str(e))
+            return None
+
+    async def _cache_kubectl_output(self, cache_key: str, output: str, generation: int) -> None:
+        """
+        Cache successful read-only kubectl output for a few seconds.
+
+        Args:
+            cache_key: Redis key for the read
+            output: kubectl stdout
+            generation: _kubectl_generation when the read started; a mutation since
+                then means the output may predate it, so it is not cached
+        """
+        if generation != self._kubectl_generation:
+            return
+        try:
+            pipe = self._get_redis_cache().pipeline()
+            pipe.set(cache_key, output, ex=_KUBECTL_CACHE_TTL)
+            pipe.sadd(_KUBECTL_CACHE_INDEX, cache_key)
+            pipe.expire(_KUBECTL_CACHE_INDEX, _KUBECTL_CACHE_TTL)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug("kubectl_cache_set_failed", error=str(e))
+
+    async def _invalidate_kubectl_cache(self) -> None:
+        """Drop all cached kubectl reads, so reads after a mutation see its effect."""
+        self._kubectl_generation += 1
+        # Reads already running may predate the mutation; later callers start afresh
+        self._kubectl_inflight.clear()
+        try:
+            cache = self._get_redis_cache()
+            keys = await cache.smembers(_KUBECTL_CACHE_INDEX)
+            await cache.delete(_KUBECTL_CACHE_INDEX, *keys)
+        except Exception as e:
+            logger.debug("kubectl_cache_invalidate_failed", error=str(e))
+
+    async def _run_kubectl_command(
+        self, args: list[str], use_cache: bool = True
+    ) -> tuple[bool, str]:
         """
         Run a kubectl command and return the output.
 
         Args:
             args: kubectl command arguments (without 'kubectl' prefix)
+            use_cache: False to always read live state (e.g. when the result drives a change)
 
         Returns:
             Tuple of (success, output)
         """
+        cache_key = _kubectl_cache_key(args) if use_cache else None
+        if not cache_key:
+            result = await self._exec_kubectl_command(args, None)
+            # Even a failed mutation (e.g. a partial drain) may have changed something
+            if args and args[0] in _KUBECTL_MUTATING_VERBS:
+                await self._invalidate_kubectl_cache()
+            return result
+
+        cached = await self._get_cached_kubectl_output(cache_key)
+        if cached is not None:
+            return True, cached
+
+        # Identical reads issued while one is already running await that same subprocess
+        key = tuple(args)
+        task = self._kubectl_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._exec_kubectl_command(args, cache_key))
+            self._kubectl_inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget_inflight_kubectl, key))
+        # shield: one caller being cancelled must not cancel the shared command
+        return await asyncio.shield(task)
+
+    def _forget_inflight_kubectl(
+        self, key: tuple[str, ...], task: asyncio.Task[tuple[bool, str]]
+    ) -> None:
+        """Done-callback: unregister *task*, unless an invalidation already replaced it."""
+        if self._kubectl_inflight.get(key) is task:
+            del self._kubectl_inflight[key]
+
+    async def _exec_kubectl_command(
+        self, args: list[str], cache_key: str | None
+    ) -> tuple[bool, str]:
+        """
+        Spawn kubectl and collect its output.
+
+        Args:
+            args: kubectl command arguments (without 'kubectl' prefix)
+            cache_key: Redis key to store successful output under, if cacheable
+
+        Returns:
+            Tuple of (success, output)
+        """
+        generation = self._kubectl_generation
         try:
             cmd = ["kubectl"] + args
             logger.info("running_kubectl", command=" ".join(cmd))
@@ -261,13 +997,25 @@ class MessageHandler:
                 *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
             )
 
-            stdout, stderr = await process.communicate()
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), timeout=_KUBECTL_TIMEOUT
+                )
+            except TimeoutError:
+                process.kill()
+                await process.wait()
+                logger.error("kubectl_command_timeout", command=" ".join(cmd))
+                return False, f"kubectl did not finish within {_KUBECTL_TIMEOUT}s"
 
             if process.returncode == 0:
-                output = stdout.decode("utf-8").strip()
+                # Single decode; rstrip leaves leading indentation (e.g. log lines) intact
+                output = stdout.decode("utf-8", errors="replace").rstrip()
+                if cache_key:
+                    await self._cache_kubectl_output(cache_key, output, generation)
                 return True, output
             else:
-                error = stderr.decode("utf-8").strip()
+                # stderr is only decoded when it is actually reported
+                error = stderr.decode("utf-8", errors="replace").strip()
                 logger.error("kubectl_command_failed", error=error, returncode=process.returncode)
                 return False, error
 
@@ -281,6 +1029,50 @@ class MessageHandler:
             logger.error("kubectl_command_error", error=str(e))
             return False, f"Error executing kubectl command: {str(e)}"
 
+    async def _get_tools_prompt(self) -> str:
+        """
+        Return the system-prompt section describing the available MCP tools.
+
+        The section is rebuilt at most every _TOOLS_PROMPT_TTL seconds. MCP servers
+        are only started and stopped with the application, so the TTL is the only
+        expiry needed.
+
+        Returns:
+            Prompt text to append, or an empty string when no tools are available
+        """
+        now = time.monotonic()
+        if self._tools_prompt_cache and now - self._tools_prompt_cache[0] < _TOOLS_PROMPT_TTL:
+            return self._tools_prompt_cache[1]
+
+        tools = await self.mcp_manager.list_all_tools() if self.mcp_manager else []
+        section = ""
+        if tools:
+            tools_description = self._format_tools_for_prompt(tools)
+            section = f'\n\nAvailable Custom Tools:\n{tools_description}\n\nTo use a tool, include in your response: TOOL_CALL: tool_name(arg1="value1", arg2="value2")'
+        self._tools_prompt_cache = (now, section)
+        return section
+
+    def _assemble_system_prompt(self, channel_type: str, tools_section: str) -> str:
+        """
+        Return the channel's system prompt with the MCP tools section appended.
+
+        The assembled prompt is kept per channel until _get_tools_prompt hands out a
+        different section, so most messages reuse it instead of concatenating a copy.
+
+        Args:
+            channel_type: Channel type (telegram, slack)
+            tools_section: Output of _get_tools_prompt, or "" without tools
+
+        Returns:
+            Full system prompt
+        """
+        cached = self._system_prompt_cache.get(channel_type)
+        if cached and cached[0] is tools_section:
+            return cached[1]
+        prompt = PromptManager.get_system_prompt(channel_type) + tools_section
+        self._system_prompt_cache[channel_type] = (tools_section, prompt)
+        return prompt
+
     def _format_tools_for_prompt(self, tools: list) -> str:
         """
         Format MCP tools for inclusion in AI prompt.
@@ -314,7 +1106,7 @@ class MessageHandler:
 
         return "\n\n".join(tool_descriptions)
 
-    async def _execute_tool_from_text(self, text: str) -> str | None:
+    async def _execute_tool_from_text(self, text: str, pos: int = 0) -> str | None:
         """
         Parse AI response for tool calls and execute them.
 
@@ -323,49 +1115,49 @@ class MessageHandler:
 
         Args:
             text: AI model response text
+            pos: Offset to start scanning from, e.g. where the caller found the
+                first "TOOL_CALL:" marker
 
         Returns:
             Tool execution result or None
         """
-        import re
+        matches = _TOOL_CALL_RE.findall(text, pos)
 
-        pattern = r"TOOL_CALL:\s*(\w+)\((.*?)\)"
-        matches = re.findall(pattern, text)
-
-        if not matches:
+        if not matches or not self.mcp_manager:
             return None
 
-        results = []
+        calls = []
         for tool_name, args_str in matches:
-            # Parse arguments (simple key=value parsing)
-            arguments = {}
-            if args_str.strip():
-                for arg_pair in args_str.split(","):
-                    if "=" in arg_pair:
-                        key, value = arg_pair.split("=", 1)
-                        key = key.strip()
-                        value = value.strip().strip("\"'")
-                        arguments[key] = value
-
-            # Execute tool via MCP manager
-            if not self.mcp_manager:
-                continue
+            # lastindex is the value alternative that matched: 2/3 quoted, 4 bare (which
+            # may still carry a stray quote when the model left one unbalanced)
+            arguments = {
+                m[1]: m[4].strip().strip("\"'") if m.lastindex == 4 else m[cast(int, m.lastindex)]
+                for m in _TOOL_ARG_RE.finditer(args_str)
+            }
+            calls.append((tool_name, arguments))
 
-            logger.info("executing_tool_from_ai_response", tool=tool_name)
-            result = await self.mcp_manager.call_tool(tool_name, arguments)
+        # Tool calls are independent, so run them concurrently; results keep call order
+        logger.info("executing_tools_from_ai_response", tools=[name for name, _ in calls])
+        outcomes = await asyncio.gather(
+            *(self.mcp_manager.call_tool(name, arguments) for name, arguments in calls),
+            return_exceptions=True,
+        )
 
-            if result and not result.get("isError"):
-                # Extract text from content
-                content = result.get("content", [])
-                if content and len(content) > 0:
-                    text_content = content[0].get("text", "")
-                    results.append(f"Tool '{tool_name}' result:\n{text_content}")
+        results = []
+        for (tool_name, _), result in zip(calls, outcomes, strict=True):
+            if isinstance(result, BaseException):
+                logger.error("tool_call_from_ai_response_failed", tool=tool_name, error=str(result))
+                results.append(f"Tool '{tool_name}' failed: {result}")
+                continue
+            content = (result or {}).get("content", [])
+            if not content:
+                continue
+            if result.get("isError"):
+                error_text = content[0].get("text", "Unknown error")
+                results.append(f"Tool '{tool_name}' failed: {error_text}")
             else:
-                # Handle error
-                content = result.get("content", [])
-                if content and len(content) > 0:
-                    error_text = content[0].get("text", "Unknown error")
-                    results.append(f"Tool '{tool_name}' failed: {error_text}")
+                text_content = content[0].get("text", "")
+                results.append(f"Tool '{tool_name}' result:\n{text_content}")
 
         return "\n\n".join(results) if results else None
 
@@ -383,7 +1175,7 @@ class MessageHandler:
                 "message.length": len(message.content),
             },
         ):
-            logger.info(
+            logger.debug(
                 "message_received",
                 channel_type=message.channel_type,
                 user_id=message.user_id,
@@ -432,28 +1224,29 @@ class MessageHandler:
                 await self._handle_kubernetes_query(followup_msg)
                 return
 
+            # Both keyword detectors share one lower-cased copy of the message
+            content_lower = message.content.lower()
+
             # Check if it's a Kubernetes-related query
-            if self._is_kubernetes_query(message.content):
+            if self._is_kubernetes_query(content_lower):
                 await self._handle_kubernetes_query(message)
                 return
 
             # Check if it's a security scanning query
-            if self._is_security_query(message.content):
+            if self._is_security_query(content_lower):
                 await self._handle_security_query(message)
                 return
 
             # Process regular message
             await self._process_message(message)
 
-    def _is_kubernetes_query(self, message_text: str) -> bool:
-        """Check if message is related to Kubernetes."""
-        message_lower = message_text.lower()
-        return any(keyword in message_lower for keyword in K8S_KEYWORDS)
+    def _is_kubernetes_query(self, message_lower: str) -> bool:
+        """Check if an already lower-cased message is related to Kubernetes."""
+        return _K8S_KEYWORDS_RE.search(message_lower) is not None
 
-    def _is_security_query(self, message_text: str) -> bool:
-        """Check if message is related to security scanning/checking."""
-        message_lower = message_text.lower()
-        return any(keyword in message_lower for keyword in SECURITY_KEYWORDS)
+    def _is_security_query(self, message_lower: str) -> bool:
+        """Check if an already lower-cased message is related to security scanning/checking."""
+        return _SECURITY_KEYWORDS_RE.search(message_lower) is not None
 
     async def _handle_kubernetes_query(self, message: ChannelMessage) -> None:
         """Handle Kubernetes-related queries."""
@@ -469,73 +1262,25 @@ class MessageHandler:
         response = None
 
         # Extract namespace if mentioned
-        namespace = None
-        namespace_patterns = [
-            r"(?:in|from|on)\s+(?:the\s+)?([a-z0-9\-]+)(?:\s+namespace)?",
-            r"([a-z0-9\-]+)\s+namespace",  # "pos-order4u namespace" - name before "namespace" keyword
-            r"namespace\s+([a-z0-9\-]+)",
-            r"-n\s+([a-z0-9\-]+)",
-        ]
-        for pattern in namespace_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                namespace = match.group(1)
-                # Skip if it's a common kubernetes keyword, not a namespace
-                if namespace not in [
-                    "pod",
-                    "pods",
-                    "deployment",
-                    "service",
-                    "node",
-                    "container",
-                    "the",
-                    "check",
-                    "show",
-                    "list",
-                    "get",
-                    "and",
-                ]:
-                    break
-                namespace = None
+        namespace = _extract_namespace(query_lower)
 
         # Detect intent and execute appropriate command
         try:
             # ── Word-number normalisation ("one replica" → "1 replica") ─────────
-            _WORD_NUMS = {
-                "zero": "0",
-                "one": "1",
-                "two": "2",
-                "three": "3",
-                "four": "4",
-                "five": "5",
-                "six": "6",
-                "seven": "7",
-                "eight": "8",
-                "nine": "9",
-                "ten": "10",
-            }
-            normalized = query_lower
-            for _w, _d in _WORD_NUMS.items():
-                normalized = re.sub(rf"\b{_w}\b", _d, normalized)
+            normalized = _WORD_NUM_RE.sub(lambda m: _WORD_NUMS[m.group(1)], query_lower)
+            intents = _match_intents(_K8S_INTENT_RE, query_lower)
 
             # ── Scale / resize — checked FIRST, before pod/deployment branches ───
             # Handles: "scale down superadmin-frontend pod to one replica"
             #          "scale my-app to 2 replicas"  "resize web to 0 replicas" etc.
-            if any(kw in normalized for kw in ("scale", "resize")) and re.search(
-                r"\d+\s+replica", normalized
+            if any(kw in normalized for kw in ("scale", "resize")) and (
+                num_match := _REPLICA_COUNT_RE.search(normalized)
             ):
-                num_match = re.search(r"(\d+)\s+replica", normalized)
                 # Extract deployment name: first hyphenated token after scale/resize verb
-                name_match = re.search(
-                    r"(?:scale\s+(?:down\s+|up\s+)?|resize\s+)([a-z0-9][a-z0-9\-\.]+)",
-                    normalized,
-                )
+                name_match = _SCALE_NAME_RE.search(normalized)
                 if not name_match:
                     # fallback: hyphenated word before pod/deployment/to N replica
-                    name_match = re.search(
-                        r"([a-z0-9][a-z0-9\-\.]{3,})(?:\s+(?:pod|deployment|app|service))?\s+(?:to\s+)?\d+\s+replica",
-                        normalized,
-                    )
+                    name_match = _SCALE_NAME_FALLBACK_RE.search(normalized)
                 if name_match and num_match:
                     deployment = name_match.group(1).rstrip("-.")
                     replicas = num_match.group(1)
@@ -545,7 +1290,7 @@ class MessageHandler:
                     resolved_ns = namespace
                     if not resolved_ns:
                         ok, all_deps = await self._run_kubectl_command(
-                            ["get", "deployment", "--all-namespaces"]
+                            ["get", "deployment", "--all-namespaces"], use_cache=False
                         )
                         if ok:
                             for _line in all_deps.splitlines()[1:]:
@@ -577,38 +1322,17 @@ class MessageHandler:
             # ── Self-healing: fix / clean up / remediate error pods ────────────
             # Catch BEFORE the generic pod-listing block so "fix these pods"
             # doesn't fall through to list logic.
-            elif any(
-                kw in query_lower
-                for kw in (
-                    "fix ",
-                    "fix these",
-                    "fix the",
-                    "fix error",
-                    "fix issue",
-                    "fix pod",
-                    "fix crash",
-                    "fix oom",
-                    "clean up pod",
-                    "cleanup pod",
-                    "clean pod",
-                    "remediat",
-                    "delete error",
-                    "delete failed",
-                    "remove error",
-                    "remove failed",
-                    "resolve pod",
-                )
-            ):
+            elif "fix" in intents:
                 response = await self._fix_problem_pods(namespace)
 
             # List pods
-            elif any(word in query_lower for word in ["pod", "pods", "container", "containers"]):
+            elif "pods" in intents:
                 if "log" in query_lower:
                     # Extract pod name
-                    pod_match = re.search(r"(?:pod|container)\s+(\S+)", query_lower)
+                    pod_match = _POD_NAME_RE.search(query_lower)
                     if pod_match:
                         pod_name = pod_match.group(1)
-                        kubectl_args = ["logs", pod_name]
+                        kubectl_args = ["logs", pod_name, _LOG_TAIL_ARG]
                         if namespace:
                             kubectl_args.extend(["-n", namespace])
                         else:
@@ -616,180 +1340,59 @@ class MessageHandler:
 
                         success, output = await self._run_kubectl_command(kubectl_args)
                         if success:
-                            lines = output.split("\n")
-                            if len(lines) > 50:
-                                output = (
-                                    "\n".join(lines[-50:])
-                                    + f"\n\n(Showing last 50 lines of {len(lines)} total)"
-                                )
-                            response = f"📜 **Logs from pod {pod_name}:**\n\n```\n{output}\n```"
+                            response = f"📜 **Logs from pod {pod_name}:**\n\n```\n{_tail_lines(output)}\n```"
                         else:
                             response = f"❌ Error getting logs: {output}"
                     else:
                         response = "❌ Please specify a pod name. Example: 'show logs from pod nginx-abc123'"
                 else:
-                    # Detect status filter
-                    status_filter = None
-                    filter_description = ""
-
-                    if any(
-                        word in query_lower
-                        for word in [
-                            "error",
-                            "errors",
-                            "failed",
-                            "failing",
-                            "crash",
-                            "crashloop",
-                            "crashloopbackoff",
-                        ]
-                    ):
-                        status_filter = "problem"
-                        filter_description = " with issues"
-                    elif any(
-                        word in query_lower for word in ["unhealthy", "not ready", "notready"]
-                    ):
-                        status_filter = "notready"
-                        filter_description = " not ready"
-                    elif "pending" in query_lower:
-                        status_filter = "pending"
-                        filter_description = " pending"
-                    elif any(word in query_lower for word in ["running", "healthy", "ready"]):
-                        status_filter = "running"
-                        filter_description = " running"
-                    elif any(word in query_lower for word in ["all", "detail", "details", "everything", "full"]):
-                        status_filter = "all"
-                        filter_description = ""
-
-                    # List pods
-                    kubectl_args = ["get", "pods", "-o", "wide"]
-                    if namespace:
-                        kubectl_args.extend(["-n", namespace])
-                    else:
-                        kubectl_args.append("--all-namespaces")
+                    # Detect status filter (first matching category wins)
+                    status_filters = _match_intents(_POD_STATUS_FILTER_RE, query_lower)
+                    status_filter = next(
+                        (f for f in _POD_STATUS_FILTER_LABELS if f in status_filters), None
+                    )
+                    filter_description = (
+                        _POD_STATUS_FILTER_LABELS[status_filter] if status_filter else ""
+                    )
 
-                    success, output = await self._run_kubectl_command(kubectl_args)
-                    if success:
-                        # Apply status filtering if requested
+                    # Stream pod rows and keep only the ones we show
+                    try:
+                        rows = self._iter_pod_rows(namespace)
+                        header = await anext(rows, "")
                         if status_filter:
-                            lines = output.split("\n")
-                            header = lines[0] if lines else ""
-                            filtered_lines = [header]
-
-                            for line in lines[1:]:
-                                if not line.strip():
-                                    continue
-
-                                if status_filter == "problem":
-                                    # Show pods that are not Running or Completed
-                                    if any(
-                                        status in line
-                                        for status in [
-                                            "Error",
-                                            "CrashLoopBackOff",
-                                            "ImagePullBackOff",
-                                            "ErrImagePull",
-                                            "Pending",
-                                            "Failed",
-                                            "Unknown",
-                                            "Terminating",
-                                            "ContainerCreating",
-                                            "OOMKilled",
-                                        ]
-                                    ):
-                                        filtered_lines.append(line)
-                                    # Also check for Running pods with restarts
-                                    elif "Running" in line:
-                                        parts = line.split()
-                                        # Check READY column (usually 2nd or 3rd column depending on namespace)
-                                        for part in parts:
-                                            if "/" in part:
-                                                ready, total = part.split("/")
-                                                if ready != total:  # Not all containers ready
-                                                    filtered_lines.append(line)
-                                                    break
-                                elif status_filter == "notready":
-                                    # Show pods where READY != total or status not Running
-                                    if "Running" not in line or any(
-                                        status in line
-                                        for status in ["Pending", "Error", "CrashLoop"]
-                                    ):
-                                        filtered_lines.append(line)
-                                    else:
-                                        parts = line.split()
-                                        for part in parts:
-                                            if "/" in part:
-                                                ready, total = part.split("/")
-                                                if ready != total:
-                                                    filtered_lines.append(line)
-                                                    break
-                                elif status_filter == "pending":
-                                    if "Pending" in line or "ContainerCreating" in line:
-                                        filtered_lines.append(line)
-                                elif status_filter == "running":
-                                    if "Running" in line:
-                                        # Check if all containers are ready
-                                        parts = line.split()
-                                        is_healthy = False
-                                        for part in parts:
-                                            if "/" in part:
-                                                ready, total = part.split("/")
-                                                if ready == total:
-                                                    is_healthy = True
-                                                break
-                                        if is_healthy:
-                                            filtered_lines.append(line)
-                                elif status_filter == "all":
-                                    filtered_lines.append(line)
+                            # Apply status filtering if requested
+                            filtered_lines = [header] + [
+                                line
+                                async for line in rows
+                                if line.strip() and _pod_line_matches(line, status_filter)
+                            ]
 
                             if len(filtered_lines) > 1:
-                                output = "\n".join(filtered_lines)
-                                formatted_output = self._format_kubectl_table(output, "pods")
+                                formatted_output = self._format_kubectl_table(
+                                    filtered_lines, "pods"
+                                )
                                 response = f"📦 **Pods{filter_description}{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n{formatted_output}"
                             else:
                                 response = f"✅ **No pods{filter_description} found{f' in namespace {namespace}' if namespace else ' (all namespaces)'}**\n\nAll pods appear to be running normally! 🎉"
                         else:
                             # No explicit filter requested — show only problem pods to keep
                             # Slack replies concise.  Show "all healthy" summary if none.
-                            lines = output.split("\n")
-                            header = lines[0] if lines else ""
-                            _bad = [
-                                "Error",
-                                "CrashLoopBackOff",
-                                "ImagePullBackOff",
-                                "Pending",
-                                "Failed",
-                                "Unknown",
-                                "Terminating",
-                                "ContainerCreating",
-                                "OOMKilled",
-                            ]
                             problem_lines: list[str] = []
                             healthy_count = 0
-                            for _line in lines[1:]:
+                            async for _line in rows:
                                 if not _line.strip():
                                     continue
-                                if any(s in _line for s in _bad):
+                                if _pod_line_matches(_line, "problem"):
                                     problem_lines.append(_line)
                                 elif "Running" in _line:
-                                    _parts = _line.split()
-                                    _degraded = False
-                                    for _p in _parts:
-                                        if "/" in _p:
-                                            _r, _t = _p.split("/", 1)
-                                            if _r != _t:
-                                                _degraded = True
-                                            break
-                                    if _degraded:
-                                        problem_lines.append(_line)
-                                    else:
-                                        healthy_count += 1
+                                    healthy_count += 1
                             ns_label = (
                                 f" in namespace `{namespace}`" if namespace else " (all namespaces)"
                             )
                             if problem_lines:
-                                _filt = "\n".join([header] + problem_lines)
-                                formatted_output = self._format_kubectl_table(_filt, "pods")
+                                formatted_output = self._format_kubectl_table(
+                                    [header] + problem_lines, "pods"
+                                )
                                 _fix_hint = (
                                     "\n\n💡 _Type **`fix pods`** or **`!k8s fix`**"
                                     + (f" (or `!k8s fix {namespace}`)" if namespace else "")
@@ -802,17 +1405,15 @@ class MessageHandler:
                                 )
                             else:
                                 response = f"✅ All {healthy_count} pod(s){ns_label} are healthy."
-                    else:
-                        response = f"❌ Error getting pods: {output}"
+                    except RuntimeError as e:
+                        response = f"❌ Error getting pods: {e}"
 
             # List deployments
-            elif any(word in query_lower for word in ["deployment", "deployments", "deploy"]):
+            elif "deployments" in intents:
                 if "scale" in query_lower:
                     # Extract deployment name and replica count
-                    deploy_match = re.search(r"(?:deployment|deploy)\s+(\S+)", query_lower)
-                    replica_match = re.search(
-                        r"(?:to\s+)?(\d+)\s+(?:replica|replicas|instance)", query_lower
-                    )
+                    deploy_match = _DEPLOY_NAME_RE.search(query_lower)
+                    replica_match = _REPLICA_RE.search(query_lower)
 
                     if deploy_match and replica_match:
                         deployment = deploy_match.group(1)
@@ -846,7 +1447,7 @@ class MessageHandler:
                         response = f"❌ Error getting deployments: {output}"
 
             # List services
-            elif any(word in query_lower for word in ["service", "services", "svc"]):
+            elif "services" in intents:
                 kubectl_args = ["get", "services", "-o", "wide"]
                 if namespace:
                     kubectl_args.extend(["-n", namespace])
@@ -860,7 +1461,7 @@ class MessageHandler:
                     response = f"❌ Error getting services: {output}"
 
             # List nodes
-            elif any(word in query_lower for word in ["node", "nodes", "cluster"]):
+            elif "nodes" in intents:
                 success, output = await self._run_kubectl_command(["get", "nodes", "-o", "wide"])
                 if success:
                     response = f"🖥️ **Nodes:**\n\n```\n{output}\n```"
@@ -868,7 +1469,7 @@ class MessageHandler:
                     response = f"❌ Error getting nodes: {output}"
 
             # List namespaces
-            elif "namespace" in query_lower and not namespace:
+            elif "namespaces" in intents and not namespace:
                 success, output = await self._run_kubectl_command(["get", "namespaces"])
                 if success:
                     response = f"🏢 **Namespaces:**\n\n```\n{output}\n```"
@@ -876,10 +1477,7 @@ class MessageHandler:
                     response = f"❌ Error getting namespaces: {output}"
 
             # Show events
-            elif any(
-                word in query_lower
-                for word in ["event", "events", "what happened", "what's happening"]
-            ):
+            elif "events" in intents:
                 kubectl_args = ["get", "events"]
                 if namespace:
                     kubectl_args.extend(["-n", namespace])
@@ -893,9 +1491,9 @@ class MessageHandler:
                     response = f"❌ Error getting events: {output}"
 
             # ── Self-healing: restart pod ──────────────────────────────────
-            elif any(word in query_lower for word in ["restart"]):
-                pod_match = re.search(r"restart\s+(?:pod\s+)?(\S+)", query_lower)
-                deploy_match = re.search(r"restart\s+(?:deployment\s+)?(\S+)", query_lower)
+            elif "restart" in intents:
+                pod_match = _RESTART_POD_RE.search(query_lower)
+                deploy_match = _RESTART_DEPLOY_RE.search(query_lower)
                 if pod_match:
                     pod_name = pod_match.group(1)
                     kubectl_args = ["delete", "pod", pod_name, "--grace-period=0"]
@@ -928,9 +1526,9 @@ class MessageHandler:
                     response = "❌ Please specify what to restart. Example: 'restart pod nginx-abc123' or 'restart deployment my-app'"
 
             # ── Self-healing: rollback deployment ─────────────────────────
-            elif "rollback" in query_lower:
-                deploy_match = re.search(r"rollback\s+(?:deployment\s+)?(\S+)", query_lower)
-                revision_match = re.search(r"to\s+revision\s+(\d+)", query_lower)
+            elif "rollback" in intents:
+                deploy_match = _ROLLBACK_RE.search(query_lower)
+                revision_match = _REVISION_RE.search(query_lower)
                 if deploy_match:
                     deploy_name = deploy_match.group(1)
                     kubectl_args = ["rollout", "undo", f"deployment/{deploy_name}"]
@@ -948,10 +1546,8 @@ class MessageHandler:
                     response = "❌ Please specify deployment to roll back. Example: 'rollback deployment my-app'"
 
             # ── Self-healing: cordon / uncordon / drain node ───────────────
-            elif any(word in query_lower for word in ["cordon", "uncordon", "drain"]):
-                node_match = re.search(
-                    r"(?:cordon|uncordon|drain)\s+(?:node\s+)?(\S+)", query_lower
-                )
+            elif "cordon" in intents:
+                node_match = _NODE_ACTION_RE.search(query_lower)
                 if node_match:
                     node_name = node_match.group(1)
                     if "uncordon" in query_lower:
@@ -979,17 +1575,14 @@ class MessageHandler:
                     response = "❌ Please specify a node name. Example: 'drain node worker-1'"
 
             # ── Self-healing: show CrashLoop pods ─────────────────────────
-            elif any(
-                word in query_lower for word in ["crashloop", "crashlooping", "crashing", "oom"]
-            ):
-                bad_statuses = ["CrashLoopBackOff", "Error", "OOMKilled", "ImagePullBackOff"]
+            elif "crashloop" in intents:
                 kubectl_args = ["get", "pods", "--all-namespaces", "-o", "wide"]
                 success, output = await self._run_kubectl_command(kubectl_args)
                 if success:
                     lines = output.split("\n")
                     header = lines[0] if lines else ""
                     problem_lines = [header] + [
-                        line for line in lines[1:] if any(s in line for s in bad_statuses)
+                        line for line in lines[1:] if _CRASHLOOP_STATUS_RE.search(line)
                     ]
                     if len(problem_lines) > 1:
                         response = (
@@ -1002,7 +1595,7 @@ class MessageHandler:
 
             # ── Explicit "fix" / "remediate" without pod/crash keyword ───────
             # e.g. "fix the cluster" / "clean up failed resources"
-            elif any(kw in query_lower for kw in ("fix", "clean", "remediat", "repair")):
+            elif "fix_any" in intents:
                 response = await self._fix_problem_pods(namespace)
 
             # Default: show help
@@ -1047,19 +1640,18 @@ class MessageHandler:
         """Persist a user/assistant exchange to the conversation history DB."""
         try:
             async with get_db_session() as db_session:
-                redis_cache = RedisCache(get_redis())
+                redis_cache = self._get_redis_cache()
                 session_mgr = SessionManager(redis_cache, db_session)
                 context_builder = ContextBuilder(db_session)
                 session_data = await session_mgr.get_or_create_session(
                     message.channel_type, message.user_id, message.username
                 )
-                conversation_id = uuid.UUID(session_data.conversation_id)
+                conversation_id = session_data.conversation_id
                 await context_builder.add_user_message(conversation_id, message.content)
                 await context_builder.add_assistant_message(
                     conversation_id, response, model_used=model_used, token_count=None
                 )
-                await session_mgr.update_session_activity(message.channel_type, message.user_id)
-                await session_mgr.increment_message_count(message.channel_type, message.user_id)
+                await session_mgr.touch_session(message.channel_type, message.user_id)
         except Exception as e:
             logger.warning("persist_exchange_failed", error=str(e))
 
@@ -1068,7 +1660,7 @@ class MessageHandler:
     ) -> None:
         """Cache the last K8s namespace in Redis so follow-up queries can reuse it."""
         try:
-            redis_cache = RedisCache(get_redis())
+            redis_cache = self._get_redis_cache()
             context_key = f"k8s-ctx:{channel_type}:{user_id}"
             await redis_cache.set(context_key, namespace or "", ttl=1800)  # 30-minute TTL
         except Exception as e:
@@ -1081,26 +1673,16 @@ class MessageHandler:
         "list all", "show more", etc. and resolves them against the last cached K8s namespace.
         Returns None if the message is not a recognised follow-up.
         """
-        FOLLOWUP_PATTERNS = [
-            r"\b(show|list|get|see|display)\b.{0,30}\b(detail|details|pods?|them|all|more|everything)\b",
-            r"^(detail|details|more info|show more|show all|list all|all of them|list them)\s*$",
-            r"\b(can you|could you|please|pls)\b.{0,40}\b(show|list|get)\b.{0,30}\b(detail|pods?|more|all|them|everything)\b",
-        ]
         msg_lower = message.content.lower().strip()
-        if not any(re.search(p, msg_lower) for p in FOLLOWUP_PATTERNS):
+        if not any(p.search(msg_lower) for p in _FOLLOWUP_RES):
             return None
         # If the message already contains an explicit namespace reference, it is a self-contained
         # query — not a follow-up. Let it be handled by normal K8s routing so it uses the
         # namespace the user typed, not a cached one.
-        NAMESPACE_INDICATORS = [
-            r"(?:in|from|on)\s+(?:the\s+)?[a-z0-9][a-z0-9\-]+\s+namespace",
-            r"\bnamespace\s+[a-z0-9][a-z0-9\-]+",
-            r"-n\s+[a-z0-9][a-z0-9\-]+",
-        ]
-        if any(re.search(pat, msg_lower) for pat in NAMESPACE_INDICATORS):
+        if any(pat.search(msg_lower) for pat in _NAMESPACE_INDICATOR_RES):
             return None
         try:
-            redis_cache = RedisCache(get_redis())
+            redis_cache = self._get_redis_cache()
             context_key = f"k8s-ctx:{message.channel_type}:{message.user_id}"
             namespace = await redis_cache.get(context_key)
             if namespace is None:
@@ -1138,131 +1720,33 @@ class MessageHandler:
             if not security_tools:
                 response = "❌ Security tools not available. SimplePortChecker MCP server may not be connected."
             else:
-                # Pattern matching for different security queries
-                import re
-
-                # 1. Port scanning: "is port 443 open on lobehub.com"
-                port_pattern = r"port\s+(\d+)\s+(?:open\s+)?(?:on|at|for)\s+([a-zA-Z0-9\.\-]+)"
-                port_match = re.search(port_pattern, query_lower)
-
-                # 2. Certificate check: "check certificate for lobehub.com", "ssl cert on example.com"
-                cert_pattern = r"(?:check|analyze|verify)?\s*(?:ssl|tls|https)?\s*(?:cert|certificate)\s+(?:for|on|of)?\s+([a-zA-Z0-9\.\-]+)"
-                cert_match = re.search(cert_pattern, query_lower)
-
-                # 3. WAF/CDN detection: "check waf on example.com", "detect cdn for site.com"
-                waf_pattern = r"(?:check|detect)?\s*(?:waf|cdn|cloudflare|protection|firewall)\s+(?:for|on)?\s+([a-zA-Z0-9\.\-]+)"
-                waf_match = re.search(waf_pattern, query_lower)
-
-                # 4. mTLS check: "check mtls on api.example.com"
-                mtls_pattern = r"(?:check|verify)?\s*mtls\s+(?:for|on)?\s+([a-zA-Z0-9\.\-]+)"
-                mtls_match = re.search(mtls_pattern, query_lower)
-
-                # 5. Security headers: "check security headers for example.com"
-                headers_pattern = (
-                    r"(?:check|scan)?\s*(?:security\s+)?headers\s+(?:for|on)?\s+([a-zA-Z0-9\.\-]+)"
+                # First matching intent wins; later patterns are not evaluated
+                route = next(
+                    (
+                        (match, tool, title)
+                        for pattern, tool, title in _SECURITY_ROUTES
+                        if (match := pattern.search(query_lower))
+                    ),
+                    None,
                 )
-                headers_match = re.search(headers_pattern, query_lower)
-
-                # 6. OWASP scan: "scan owasp vulnerabilities on example.com"
-                owasp_pattern = r"(?:scan|check)?\s*owasp\s+(?:vulnerabilities)?\s+(?:for|on)?\s+([a-zA-Z0-9\.\-]+)"
-                owasp_match = re.search(owasp_pattern, query_lower)
-
-                # 7. Full security scan: "full security scan on example.com", "security assessment for site.com"
-                full_scan_pattern = r"(?:full|complete|comprehensive)?\s*security\s+(?:scan|assessment|check)\s+(?:for|on)?\s+([a-zA-Z0-9\.\-]+)"
-                full_scan_match = re.search(full_scan_pattern, query_lower)
-
-                # Route to appropriate tool
-                if port_match:
-                    port = port_match.group(1)
-                    host = port_match.group(2)
-                    logger.info("calling_security_tool", tool="scan_ports", host=host, port=port)
-                    result = await self.mcp_manager.call_tool(
-                        "scan_ports", {"target": host, "ports": [int(port)]}
-                    )
-                    response = self._format_tool_result(result, "🔌 Port Scan", host)
-
-                elif cert_match:
-                    host = cert_match.group(1)
-                    logger.info("calling_security_tool", tool="analyze_certificate", host=host)
-                    result = await self.mcp_manager.call_tool(
-                        "analyze_certificate", {"target": host}
-                    )
-                    response = self._format_tool_result(result, "🔒 Certificate Analysis", host)
 
-                elif waf_match:
-                    host = waf_match.group(1)
-                    logger.info("calling_security_tool", tool="detect_l7_protection", host=host)
-                    result = await self.mcp_manager.call_tool(
-                        "detect_l7_protection", {"target": host}
-                    )
-                    response = self._format_tool_result(result, "🛡️ WAF/CDN Detection", host)
-
-                elif mtls_match:
-                    host = mtls_match.group(1)
-                    logger.info("calling_security_tool", tool="check_mtls", host=host)
-                    result = await self.mcp_manager.call_tool("check_mtls", {"target": host})
-                    response = self._format_tool_result(result, "🔐 mTLS Check", host)
-
-                elif headers_match:
-                    host = headers_match.group(1)
-                    logger.info("calling_security_tool", tool="check_security_headers", host=host)
-                    result = await self.mcp_manager.call_tool(
-                        "check_security_headers", {"target": host}
-                    )
-                    response = self._format_tool_result(result, "📋 Security Headers", host)
-
-                elif owasp_match:
-                    host = owasp_match.group(1)
+                if route:
+                    match, tool, title = route
+                    host = match.groups()[-1]
+                    arguments: dict = {"target": host}
+                    if tool == "scan_ports":
+                        arguments["ports"] = [int(match[1])]
                     logger.info(
-                        "calling_security_tool", tool="scan_owasp_vulnerabilities", host=host
-                    )
-                    result = await self.mcp_manager.call_tool(
-                        "scan_owasp_vulnerabilities", {"target": host}
+                        "calling_security_tool", tool=tool, host=host, ports=arguments.get("ports")
                     )
-                    response = self._format_tool_result(result, "🔍 OWASP Vulnerability Scan", host)
-
-                elif full_scan_match:
-                    host = full_scan_match.group(1)
-                    logger.info("calling_security_tool", tool="full_security_scan", host=host)
-                    result = await self.mcp_manager.call_tool(
-                        "full_security_scan", {"target": host}
-                    )
-                    response = self._format_tool_result(result, "🔎 Full Security Assessment", host)
+                    result = await self.mcp_manager.call_tool(tool, arguments)
+                    response = self._format_tool_result(result, title, host)
 
                 else:
                     # Show help with all available tools
-                    tool_names = [t.get("name", "Unknown") for t in security_tools]
-                    response = f"""🔧 **Security Tools Available**
-
-I have {len(security_tools)} security tools from SimplePortChecker:
-
-**Port Scanning:**
-• "is port 443 open on example.com"
-• "scan ports on example.com"
-
-**Certificate Analysis:**
-• "check certificate for example.com"
-• "analyze ssl cert on example.com"
-
-**WAF/CDN Detection:**
-• "detect waf on example.com"
-• "check cloudflare protection for site.com"
-
-**mTLS Verification:**
-• "check mtls on api.example.com"
-
-**Security Headers:**
-• "check security headers for example.com"
-• "scan headers on site.com"
-
-**OWASP Scanning:**
-• "scan owasp vulnerabilities on example.com"
-
-**Full Security Assessment:**
-• "full security scan on example.com"
-• "comprehensive security assessment for site.com"
-
-**Available Tools:** {", ".join(tool_names)}"""
+                    response = _security_help(
+                        tuple(t.get("name", "Unknown") for t in security_tools)
+                    )
 
         except Exception as e:
             logger.error("security_query_error", error=str(e))
@@ -1272,104 +1756,122 @@ I have {len(security_tools)} security tools from SimplePortChecker:
         if response:
             await self.router.send_message(message.channel_type, message.user_id, response)
 
-    def _format_tool_result(self, result: dict, title: str, target: str) -> str:
+    @staticmethod
+    def _format_tool_result(result: dict | None, title: str, target: str) -> str:
         """Format tool execution result for display."""
+        content = result.get("content") if result else None
+        first = content[0] if content else None
         if result and not result.get("isError"):
-            content = result.get("content", [])
-            if content and len(content) > 0:
-                result_text = content[0].get("text", "No result")
-                return f"{title}\n\n**Target:** {target}\n\n{result_text}"
+            if first is not None:
+                return f"{title}\n\n**Target:** {target}\n\n{first.get('text', 'No result')}"
             return f"✅ {title} completed for {target} (no detailed output)"
-        else:
-            content = result.get("content", [])
-            if content and len(content) > 0:
-                error_text = content[0].get("text", "Unknown error")
-                return f"❌ **{title} Failed**\n\n{error_text}"
-            return f"❌ Error executing {title} on {target}"
+        if first is not None:
+            return f"❌ **{title} Failed**\n\n{first.get('text', 'Unknown error')}"
+        return f"❌ Error executing {title} on {target}"
 
     async def _handle_command(self, message: ChannelMessage) -> None:
         """Handle command messages."""
-        command_parts = message.content.split()
+        # Split off only the command word; the rest is tokenised once we know it's a command
+        head, *rest = message.content.split(None, 1)
         # Normalise: /k8s and !k8s are equivalent; accept bare 'k8s' too
-        command = command_parts[0].lower()
+        command = head.lower()
         if not command.startswith("/"):
             command = "/" + command.lstrip("!")
 
-        logger.info("command_received", command=command, parts=command_parts)
+        handler = self._commands.get(command)
+        session_handler = self._session_commands.get(command)
+        # An unknown command could be a long message that merely starts with '/'; only
+        # known commands get their arguments tokenised
+        known = handler is not None or session_handler is not None
+        args = rest[0].split() if rest and known else []
+        logger.info("command_received", command=command, args=args)
+
+        if handler is not None:
+            response = await handler(message, args)
+        elif session_handler is not None:
+            async with get_db_session() as db_session:
+                session_mgr = SessionManager(self._get_redis_cache(), db_session)
+                response = await session_handler(message, args, session_mgr)
+        else:
+            response = await self._cmd_unknown(message, args)
 
-        async with get_db_session() as db_session:
-            session_mgr = SessionManager(RedisCache(get_redis()), db_session)
-            session_data = await session_mgr.get_or_create_session(
-                message.channel_type, message.user_id, message.username
-            )
+        # Send response
+        await self.router.send_message(message.channel_type, message.user_id, response)
 
-            if command == "/help":
-                response = PromptManager.get_command_help()
+    # ──────────────────────────────────────────────────────────────────────
+    # Chat commands — one coroutine per command, routed via _commands
+    # ──────────────────────────────────────────────────────────────────────
 
-            elif command == "/reset":
-                await session_mgr.clear_session(message.channel_type, message.user_id)
-                response = "Conversation reset! Starting fresh."
+    async def _cmd_help(self, message: ChannelMessage, args: list[str]) -> str:
+        return PromptManager.get_command_help()
 
-            elif command == "/status":
-                context_builder = ContextBuilder(db_session)
-                stats = await context_builder.get_message_stats(
-                    uuid.UUID(session_data.conversation_id)
-                )
-                model_selector = ModelSelector(db_session)
-                current_model = await model_selector.select_model(
-                    uuid.UUID(session_data.user_id),
-                    uuid.UUID(session_data.conversation_id),
-                    message.channel_type,
-                )
-                response = f"""📊 Status:
+    async def _cmd_reset(
+        self, message: ChannelMessage, args: list[str], session_mgr: SessionManager
+    ) -> str:
+        await session_mgr.clear_session(message.channel_type, message.user_id)
+        return "Conversation reset! Starting fresh."
+
+    async def _cmd_status(
+        self, message: ChannelMessage, args: list[str], session_mgr: SessionManager
+    ) -> str:
+        session_data = await session_mgr.get_or_create_session(
+            message.channel_type, message.user_id, message.username
+        )
+        context_builder = ContextBuilder(session_mgr.db_session)
+        stats = await context_builder.get_message_stats(session_data.conversation_id)
+        model_selector = ModelSelector(session_mgr.db_session)
+        current_model = await model_selector.select_model(
+            session_data.user_id,
+            session_data.conversation_id,
+            message.channel_type,
+        )
+        return f"""📊 Status:
 Model: {current_model}
 Messages: {stats["message_count"]}
 Tokens: {stats["total_tokens"]}"""
 
-            elif command == "/model":
-                if len(command_parts) < 2:
-                    response = "Usage: /model <gpt-4|claude-3-opus|llama-3-70b>"
-                else:
-                    new_model = command_parts[1]
-                    if self.ai_client.is_model_supported(new_model):
-                        model_selector = ModelSelector(db_session)
-                        await model_selector.set_user_model(
-                            uuid.UUID(session_data.user_id), new_model
-                        )
-                        response = f"Model set to: {new_model}"
-                    else:
-                        supported = ", ".join(self.ai_client.list_supported_models())
-                        response = f"Unsupported model. Available: {supported}"
-
-            elif command == "/k8s":
-                logger.info("k8s_command_received", args=command_parts[1:])
-                try:
-                    response = await self._handle_k8s_command(
-                        command_parts[1:] if len(command_parts) > 1 else []
-                    )
-                    logger.info("k8s_command_processed", response_length=len(response))
-                except Exception as e:
-                    logger.error("k8s_command_failed", error=str(e), error_type=type(e).__name__)
-                    response = f"Error processing Kubernetes command: {str(e)}"
+    async def _cmd_model(
+        self, message: ChannelMessage, args: list[str], session_mgr: SessionManager
+    ) -> str:
+        if not args:
+            return "Usage: /model <gpt-4|claude-3-opus|llama-3-70b>"
+        new_model = args[0]
+        if not self.ai_client.is_model_supported(new_model):
+            supported = ", ".join(self.ai_client.list_supported_models())
+            return f"Unsupported model. Available: {supported}"
+        # A preference belongs to the user; no conversation needs to exist for it
+        user_id = await session_mgr.get_user_id(
+            message.channel_type, message.user_id, message.username
+        )
+        model_selector = ModelSelector(session_mgr.db_session)
+        await model_selector.set_user_model(user_id, new_model)
+        return f"Model set to: {new_model}"
 
-            elif command == "/approval":
-                response = await self._handle_approval_command(command_parts[1:], message)
+    async def _cmd_k8s(self, message: ChannelMessage, args: list[str]) -> str:
+        logger.info("k8s_command_received", args=args)
+        try:
+            response = await self._handle_k8s_command(args)
+            logger.info("k8s_command_processed", response_length=len(response))
+        except Exception as e:
+            logger.error("k8s_command_failed", error=str(e), error_type=type(e).__name__)
+            response = f"Error processing Kubernetes command: {str(e)}"
+        return response
 
-            elif command == "/incident":
-                response = await self._handle_incident_command(command_parts[1:])
+    async def _cmd_approval(self, message: ChannelMessage, args: list[str]) -> str:
+        return await self._handle_approval_command(args, message)
 
-            elif command == "/alert":
-                response = await self._handle_alert_command(command_parts[1:])
+    async def _cmd_incident(self, message: ChannelMessage, args: list[str]) -> str:
+        return await self._handle_incident_command(args)
 
-            else:
-                response = (
-                    "Unknown command. Try `!help`\n\n"
-                    "*Tip for Slack users:* prefix commands with `!` instead of `/`\n"
-                    "e.g. `!k8s pods`, `!k8s scale <name> <n>`, `!status`"
-                )
+    async def _cmd_alert(self, message: ChannelMessage, args: list[str]) -> str:
+        return await self._handle_alert_command(args)
 
-            # Send response
-            await self.router.send_message(message.channel_type, message.user_id, response)
+    async def _cmd_unknown(self, message: ChannelMessage, args: list[str]) -> str:
+        return (
+            "Unknown command. Try `!help`\n\n"
+            "*Tip for Slack users:* prefix commands with `!` instead of `/`\n"
+            "e.g. `!k8s pods`, `!k8s scale <name> <n>`, `!status`"
+        )
 
     async def _handle_k8s_command(self, args: list[str]) -> str:
         """
@@ -1382,269 +1884,245 @@ Tokens: {stats["total_tokens"]}"""
             Response message
         """
         if not args or args[0] == "help":
-            return """🔧 Kubernetes Commands
-
-Pod Management:
-• /k8s pods - List all pods
-• /k8s pods <namespace> - List pods in namespace
-• /k8s fix - Auto-remediate Error/CrashLoop/OOMKilled pods (all namespaces)
-• /k8s fix <namespace> - Fix problem pods in a specific namespace
-• /k8s describe pod <name> [namespace] - Get pod details
-• /k8s logs <pod-name> [namespace] - Get pod logs
-• /k8s top pods - Show pod resource usage
-
-Deployment Management:
-• /k8s deployments [namespace] - List deployments
-• /k8s scale <deployment> <replicas> [namespace] - Scale deployment
-• /k8s rollout status <deployment> [namespace] - Check rollout status
-
-Service Management:
-• /k8s services [namespace] - List services
-• /k8s endpoints [namespace] - List endpoints
-
-Node Management:
-• /k8s nodes - List nodes
-• /k8s top nodes - Show node resource usage
-• /k8s describe node <name> - Get node details
-
-Namespace Management:
-• /k8s namespaces - List all namespaces
-
-Helm:
-• /k8s helm list - List Helm releases
-• /k8s helm status <release> - Get Helm release status
-
-Events & Logs:
-• /k8s events [namespace] - Show recent events
-• /k8s logs <pod> [namespace] - Get pod logs
-
-Configuration:
-• /k8s contexts - List available contexts
-• /k8s config - View current configuration
-
-Examples:
-  /k8s pods production
-  /k8s logs nginx-abc123 production
-  /k8s scale api-server 5 production
-  /k8s nodes
-  /k8s deployments
-
-Note: Kubernetes MCP tools are integrated. You can manage your cluster directly from this chat!
-"""
+            return _K8S_HELP
 
         subcommand = args[0].lower()
 
-        try:
-            # Handle different subcommands with kubectl
-            if subcommand == "pods":
-                namespace = args[1] if len(args) > 1 else None
-                logger.info("k8s_listing_pods", namespace=namespace)
-
-                kubectl_args = ["get", "pods"]
-                if namespace:
-                    kubectl_args.extend(["-n", namespace])
-                else:
-                    kubectl_args.append("--all-namespaces")
-
-                success, output = await self._run_kubectl_command(kubectl_args)
-                if success:
-                    formatted_output = self._format_kubectl_table(output, "pods")
-                    return f"📦 **Pods{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n{formatted_output}"
-                else:
-                    return f"❌ Error getting pods: {output}"
-
-            elif subcommand == "nodes":
-                logger.info("k8s_listing_nodes")
-                success, output = await self._run_kubectl_command(["get", "nodes"])
-                if success:
-                    formatted_output = self._format_kubectl_table(output, "nodes")
-                    return f"🖥️ **Nodes:**\n\n{formatted_output}"
-                else:
-                    return f"❌ Error getting nodes: {output}"
+        handler = self._k8s_dispatch.get(subcommand)
+        if handler is None:
+            return f"❌ Unknown Kubernetes command: {subcommand}\n\nTry `/k8s help` for available commands."
 
-            elif subcommand == "namespaces":
-                logger.info("k8s_listing_namespaces")
-                success, output = await self._run_kubectl_command(["get", "namespaces"])
-                if success:
-                    return f"🏢 **Namespaces:**\n\n```\n{output}\n```"
-                else:
-                    return f"❌ Error getting namespaces: {output}"
-
-            elif subcommand == "deployments":
-                namespace = args[1] if len(args) > 1 else None
-                logger.info("k8s_listing_deployments", namespace=namespace)
-                kubectl_args = ["get", "deployments"]
-                if namespace:
-                    kubectl_args.extend(["-n", namespace])
-                else:
-                    kubectl_args.append("--all-namespaces")
-                success, output = await self._run_kubectl_command(kubectl_args)
-                if success:
-                    formatted_output = self._format_kubectl_table(output, "deployments")
-                    return f"🚀 **Deployments{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n{formatted_output}"
-                else:
-                    return f"❌ Error getting deployments: {output}"
-
-            elif subcommand == "services":
-                namespace = args[1] if len(args) > 1 else None
-                logger.info("k8s_listing_services", namespace=namespace)
-                kubectl_args = ["get", "services"]
-                if namespace:
-                    kubectl_args.extend(["-n", namespace])
-                else:
-                    kubectl_args.append("--all-namespaces")
-                success, output = await self._run_kubectl_command(kubectl_args)
-                if success:
-                    return f"🌐 **Services{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n```\n{output}\n```"
-                else:
-                    return f"❌ Error getting services: {output}"
-
-            elif subcommand == "contexts":
-                logger.info("k8s_listing_contexts")
-                success, output = await self._run_kubectl_command(["config", "get-contexts"])
-                if success:
-                    return f"🔧 **Contexts:**\n\n```\n{output}\n```"
-                else:
-                    return f"❌ Error getting contexts: {output}"
-
-            elif subcommand == "logs":
-                if len(args) < 2:
-                    return "❌ Usage: /k8s logs <pod-name> [namespace]"
-                pod_name = args[1]
-                namespace = args[2] if len(args) > 2 else "default"
-                logger.info("k8s_getting_logs", pod=pod_name, namespace=namespace)
-                success, output = await self._run_kubectl_command(
-                    ["logs", pod_name, "-n", namespace]
-                )
-                if success:
-                    # Limit log output to last 50 lines for readability
-                    lines = output.split("\n")
-                    if len(lines) > 50:
-                        output = (
-                            "\n".join(lines[-50:])
-                            + f"\n\n(Showing last 50 lines of {len(lines)} total)"
-                        )
-                    return f"📜 **Logs from pod {pod_name} in namespace {namespace}:**\n\n```\n{output}\n```"
-                else:
-                    return f"❌ Error getting logs: {output}"
-
-            elif subcommand == "scale":
-                if len(args) < 3:
-                    return "❌ Usage: /k8s scale <deployment> <replicas> [namespace]"
-                deployment = args[1]
-                replicas = args[2]
-                namespace = args[3] if len(args) > 3 else "default"
-                logger.info(
-                    "k8s_scaling_deployment",
-                    deployment=deployment,
-                    replicas=replicas,
-                    namespace=namespace,
-                )
-                success, output = await self._run_kubectl_command(
-                    ["scale", "deployment", deployment, f"--replicas={replicas}", "-n", namespace]
-                )
-                if success:
-                    return f"⚖️ **Scaling deployment {deployment} to {replicas} replicas in namespace {namespace}:**\n\n{output}"
-                else:
-                    return f"❌ Error scaling deployment: {output}"
-
-            elif subcommand == "events":
-                namespace = args[1] if len(args) > 1 else None
-                logger.info("k8s_listing_events", namespace=namespace)
-                kubectl_args = ["get", "events"]
-                if namespace:
-                    kubectl_args.extend(["-n", namespace])
-                else:
-                    kubectl_args.append("--all-namespaces")
-                success, output = await self._run_kubectl_command(kubectl_args)
-                if success:
-                    return f"📰 **Events{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n```\n{output}\n```"
-                else:
-                    return f"❌ Error getting events: {output}"
-
-            elif subcommand == "describe":
-                if len(args) < 3:
-                    return "❌ Usage: /k8s describe <resource-type> <name> [namespace]"
-                resource_type = args[1]
-                name = args[2]
-                namespace = args[3] if len(args) > 3 else "default"
-                logger.info(
-                    "k8s_describe", resource_type=resource_type, name=name, namespace=namespace
-                )
-
-                kubectl_args = ["describe", resource_type, name]
-                # Don't add namespace for cluster-scoped resources like nodes
-                if resource_type.lower() not in ["node", "nodes", "namespace", "namespaces"]:
-                    kubectl_args.extend(["-n", namespace])
+        try:
+            return await handler(args)
+        except Exception as e:
+            logger.error("k8s_command_error", error=str(e), subcommand=subcommand)
+            return f"❌ Error executing Kubernetes command: {str(e)}\n\nPlease check your cluster configuration and try again."
 
-                success, output = await self._run_kubectl_command(kubectl_args)
-                if success:
-                    return f"🔍 **{resource_type} {name}:**\n\n```\n{output}\n```"
-                else:
-                    return f"❌ Error describing {resource_type}: {output}"
+    # ──────────────────────────────────────────────────────────────────────
+    # /k8s subcommands — one coroutine per subcommand, routed via _k8s_dispatch
+    # ──────────────────────────────────────────────────────────────────────
 
-            elif subcommand == "helm":
-                if len(args) < 2:
-                    return "❌ Usage: /k8s helm <list|status|...> [args...]"
-                helm_command = args[1]
-                logger.info("k8s_helm_command", command=helm_command)
+    async def _k8s_pods(self, args: list[str]) -> str:
+        """/k8s pods [namespace] — list pods."""
+        namespace = args[1] if len(args) > 1 else None
+        logger.info("k8s_listing_pods", namespace=namespace)
 
-                if helm_command == "list":
-                    success, output = await self._run_kubectl_command(
-                        ["get", "all", "-A", "-l", "app.kubernetes.io/managed-by=Helm"]
-                    )
-                    if success:
-                        return f"⎈ **Helm-managed Resources:**\n\n```\n{output}\n```\n\n_Note: For full Helm functionality, install helm CLI and use: helm list --all-namespaces_"
-                    else:
-                        return f"❌ Error listing Helm resources: {output}"
-                else:
-                    return f"⎈ Helm command '{helm_command}' requires helm CLI. This bot focuses on kubectl commands.\n\nFor Helm: install helm and run: `helm {helm_command}`"
-
-            elif subcommand == "top":
-                if len(args) < 2:
-                    return "❌ Usage: /k8s top <pods|nodes> [namespace]"
-                resource = args[1]
-                logger.info("k8s_top", resource=resource)
-
-                kubectl_args = ["top", resource]
-                if resource == "pods" and len(args) > 2:
-                    kubectl_args.extend(["-n", args[2]])
-                elif resource == "pods":
-                    kubectl_args.append("--all-namespaces")
+        try:
+            rows = [line async for line in self._iter_pod_rows(namespace)]
+        except RuntimeError as e:
+            return f"❌ Error getting pods: {e}"
+        formatted_output = self._format_kubectl_table(rows, "pods") if len(rows) > 1 else ""
+        return f"📦 **Pods{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n{formatted_output or 'No resources found'}"
+
+    async def _k8s_nodes(self, args: list[str]) -> str:
+        """/k8s nodes — list cluster nodes."""
+        logger.info("k8s_listing_nodes")
+        k8s = await get_k8s_client()
+        if k8s.is_available:
+            try:
+                nodes = await k8s.list_nodes()
+            except Exception as e:
+                logger.error("k8s_list_nodes_failed", error=str(e))
+                return f"❌ Error getting nodes: {getattr(e, 'reason', None) or e}"
+            rows = ["NAME   STATUS   ROLES   AGE   VERSION", *map(_node_dict_to_row, nodes)]
+            return f"🖥️ **Nodes:**\n\n{self._format_kubectl_table(rows, 'nodes')}"
+
+        success, output = await self._run_kubectl_command(["get", "nodes"])
+        if success:
+            formatted_output = self._format_kubectl_table(output, "nodes")
+            return f"🖥️ **Nodes:**\n\n{formatted_output}"
+        else:
+            return f"❌ Error getting nodes: {output}"
+
+    async def _k8s_namespaces(self, args: list[str]) -> str:
+        """/k8s namespaces — list namespaces."""
+        logger.info("k8s_listing_namespaces")
+        success, output = await self._run_kubectl_command(["get", "namespaces"])
+        if success:
+            return f"🏢 **Namespaces:**\n\n```\n{output}\n```"
+        else:
+            return f"❌ Error getting namespaces: {output}"
 
-                success, output = await self._run_kubectl_command(kubectl_args)
-                if success:
-                    namespace_info = (
-                        f" in namespace {args[2]}" if resource == "pods" and len(args) > 2 else ""
-                    )
-                    return f"📊 **{resource.capitalize()} Resource Usage{namespace_info}:**\n\n```\n{output}\n```"
-                else:
-                    if "metrics-server" in output.lower():
-                        return "❌ Metrics Server not available. Install it with:\n```\nkubectl apply -f https://github.com/kubernetes-sigs/metrics-server/releases/latest/download/components.yaml\n```"
-                    return f"❌ Error getting resource usage: {output}"
+    async def _k8s_deployments(self, args: list[str]) -> str:
+        """/k8s deployments [namespace] — list deployments."""
+        namespace = args[1] if len(args) > 1 else None
+        logger.info("k8s_listing_deployments", namespace=namespace)
+        kubectl_args = ["get", "deployments"]
+        if namespace:
+            kubectl_args.extend(["-n", namespace])
+        else:
+            kubectl_args.append("--all-namespaces")
+        success, output = await self._run_kubectl_command(kubectl_args)
+        if success:
+            formatted_output = self._format_kubectl_table(output, "deployments")
+            return f"🚀 **Deployments{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n{formatted_output}"
+        else:
+            return f"❌ Error getting deployments: {output}"
 
-            elif subcommand == "config":
-                logger.info("k8s_viewing_config")
-                success, output = await self._run_kubectl_command(["config", "view"])
-                if success:
-                    # Limit output for security - don't show full config in chat
-                    lines = output.split("\n")[:20]
-                    truncated = "\n".join(lines)
-                    return f"📋 **Kubernetes Configuration (first 20 lines):**\n\n```yaml\n{truncated}\n...\n```\n\n_For full config, use: kubectl config view_"
-                else:
-                    return f"❌ Error viewing config: {output}"
+    async def _k8s_services(self, args: list[str]) -> str:
+        """/k8s services [namespace] — list services."""
+        namespace = args[1] if len(args) > 1 else None
+        logger.info("k8s_listing_services", namespace=namespace)
+        kubectl_args = ["get", "services"]
+        if namespace:
+            kubectl_args.extend(["-n", namespace])
+        else:
+            kubectl_args.append("--all-namespaces")
+        success, output = await self._run_kubectl_command(kubectl_args)
+        if success:
+            return f"🌐 **Services{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n```\n{output}\n```"
+        else:
+            return f"❌ Error getting services: {output}"
+
+    async def _k8s_contexts(self, args: list[str]) -> str:
+        """/k8s contexts — list kubeconfig contexts."""
+        logger.info("k8s_listing_contexts")
+        success, output = await self._run_kubectl_command(["config", "get-contexts"])
+        if success:
+            return f"🔧 **Contexts:**\n\n```\n{output}\n```"
+        else:
+            return f"❌ Error getting contexts: {output}"
+
+    async def _k8s_logs(self, args: list[str]) -> str:
+        """/k8s logs <pod> [namespace] — show the tail of a pod's logs."""
+        if len(args) < 2:
+            return "❌ Usage: /k8s logs <pod-name> [namespace]"
+        pod_name = args[1]
+        namespace = args[2] if len(args) > 2 else "default"
+        logger.info("k8s_getting_logs", pod=pod_name, namespace=namespace)
+        success, output = await self._run_kubectl_command(
+            ["logs", pod_name, "-n", namespace, _LOG_TAIL_ARG]
+        )
+        if success:
+            # Limit log output to the last lines for readability
+            output = _tail_lines(output)
+            return (
+                f"📜 **Logs from pod {pod_name} in namespace {namespace}:**\n\n```\n{output}\n```"
+            )
+        else:
+            return f"❌ Error getting logs: {output}"
+
+    async def _k8s_scale(self, args: list[str]) -> str:
+        """/k8s scale <deployment> <replicas> [namespace] — scale a deployment."""
+        if len(args) < 3:
+            return "❌ Usage: /k8s scale <deployment> <replicas> [namespace]"
+        deployment = args[1]
+        replicas = args[2]
+        namespace = args[3] if len(args) > 3 else "default"
+        logger.info(
+            "k8s_scaling_deployment",
+            deployment=deployment,
+            replicas=replicas,
+            namespace=namespace,
+        )
+        success, output = await self._run_kubectl_command(
+            ["scale", "deployment", deployment, f"--replicas={replicas}", "-n", namespace]
+        )
+        if success:
+            return f"⚖️ **Scaling deployment {deployment} to {replicas} replicas in namespace {namespace}:**\n\n{output}"
+        else:
+            return f"❌ Error scaling deployment: {output}"
 
-            elif subcommand == "fix":
-                # /k8s fix [namespace]  — auto-remediate error/crash/failed pods
-                fix_ns = args[1] if len(args) > 1 else None
-                return await self._fix_problem_pods(fix_ns)
+    async def _k8s_events(self, args: list[str]) -> str:
+        """/k8s events [namespace] — list events."""
+        namespace = args[1] if len(args) > 1 else None
+        logger.info("k8s_listing_events", namespace=namespace)
+        kubectl_args = ["get", "events"]
+        if namespace:
+            kubectl_args.extend(["-n", namespace])
+        else:
+            kubectl_args.append("--all-namespaces")
+        success, output = await self._run_kubectl_command(kubectl_args)
+        if success:
+            return f"📰 **Events{f' in namespace {namespace}' if namespace else ' (all namespaces)'}:**\n\n```\n{output}\n```"
+        else:
+            return f"❌ Error getting events: {output}"
+
+    async def _k8s_describe(self, args: list[str]) -> str:
+        """/k8s describe <type> <name> [namespace] — describe a resource."""
+        if len(args) < 3:
+            return "❌ Usage: /k8s describe <resource-type> <name> [namespace]"
+        resource_type = args[1]
+        name = args[2]
+        namespace = args[3] if len(args) > 3 else "default"
+        logger.info("k8s_describe", resource_type=resource_type, name=name, namespace=namespace)
+
+        kubectl_args = ["describe", resource_type, name]
+        # Don't add namespace for cluster-scoped resources like nodes
+        if resource_type.lower() not in _CLUSTER_SCOPED_RESOURCES:
+            kubectl_args.extend(["-n", namespace])
 
+        success, output = await self._run_kubectl_command(kubectl_args)
+        if success:
+            return f"🔍 **{resource_type} {name}:**\n\n```\n{output}\n```"
+        else:
+            return f"❌ Error describing {resource_type}: {output}"
+
+    async def _k8s_helm(self, args: list[str]) -> str:
+        """/k8s helm <list|...> — list Helm-managed resources."""
+        if len(args) < 2:
+            return "❌ Usage: /k8s helm <list|status|...> [args...]"
+        helm_command = args[1]
+        logger.info("k8s_helm_command", command=helm_command)
+
+        if helm_command == "list":
+            success, output = await self._run_kubectl_command(
+                ["get", "all", "-A", "-l", "app.kubernetes.io/managed-by=Helm"]
+            )
+            if success:
+                return f"⎈ **Helm-managed Resources:**\n\n```\n{output}\n```\n\n_Note: For full Helm functionality, install helm CLI and use: helm list --all-namespaces_"
             else:
-                return f"❌ Unknown Kubernetes command: {subcommand}\n\nTry `/k8s help` for available commands."
+                return f"❌ Error listing Helm resources: {output}"
+        else:
+            return f"⎈ Helm command '{helm_command}' requires helm CLI. This bot focuses on kubectl commands.\n\nFor Helm: install helm and run: `helm {helm_command}`"
+
+    async def _k8s_top(self, args: list[str]) -> str:
+        """/k8s top <pods|nodes> [namespace] — show resource usage."""
+        if len(args) < 2:
+            return "❌ Usage: /k8s top <pods|nodes> [namespace]"
+        resource = args[1]
+        logger.info("k8s_top", resource=resource)
+
+        kubectl_args = ["top", resource]
+        if resource == "pods" and len(args) > 2:
+            kubectl_args.extend(["-n", args[2]])
+        elif resource == "pods":
+            kubectl_args.append("--all-namespaces")
 
-        except Exception as e:
-            logger.error("k8s_command_error", error=str(e), subcommand=subcommand)
-            return f"❌ Error executing Kubernetes command: {str(e)}\n\nPlease check your cluster configuration and try again."
+        success, output = await self._run_kubectl_command(kubectl_args)
+        if success:
+            namespace_info = (
+                f" in namespace {args[2]}" if resource == "pods" and len(args) > 2 else ""
+            )
+            return f"📊 **{resource.capitalize()} Resource Usage{namespace_info}:**\n\n```\n{output}\n```"
+        else:
+            if "metrics-server" in output.lower():
+                return "❌ Metrics Server not available. Install it with:\n```\nkubectl apply -f https://github.com/kubernetes-sigs/metrics-server/releases/latest/download/components.yaml\n```"
+            return f"❌ Error getting resource usage: {output}"
+
+    async def _k8s_config(self, args: list[str]) -> str:
+        """/k8s config — summarise the kubeconfig contexts."""
+        logger.info("k8s_viewing_config")
+        # Only fetch the fields we show - never put cluster/user entries in chat
+        success, output = await self._run_kubectl_command(
+            ["config", "view", "-o", _KUBECONFIG_SUMMARY_JSONPATH]
+        )
+        if success:
+            current, _, names = output.partition("\n")
+            contexts = ", ".join(f"`{name}`" for name in names.split()) or "_none_"
+            return (
+                "📋 **Kubernetes Configuration:**\n\n"
+                f"• Current context: `{current or 'not set'}`\n"
+                f"• Contexts: {contexts}\n\n"
+                "_For full config, use: kubectl config view_"
+            )
+        else:
+            return f"❌ Error viewing config: {output}"
+
+    async def _k8s_fix(self, args: list[str]) -> str:
+        """/k8s fix [namespace] — auto-remediate error/crash/failed pods."""
+        fix_ns = args[1] if len(args) > 1 else None
+        return await self._fix_problem_pods(fix_ns)
 
     # ──────────────────────────────────────────────────────────────────────
     # Pod remediation helper
@@ -1669,7 +2147,8 @@ Note: Kubernetes MCP tools are integrated. You can manage your cluster directly
         else:
             kubectl_args.append("--all-namespaces")
 
-        success, output = await self._run_kubectl_command(kubectl_args)
+        # Pods are deleted based on this listing, so it must not come from the cache
+        success, output = await self._run_kubectl_command(kubectl_args, use_cache=False)
         if not success:
             return f"❌ Could not list pods: {output}"
 
@@ -1699,38 +2178,20 @@ Note: Kubernetes MCP tools are integrated. You can manage your cluster directly
 
             # Determine if this pod is a problem
             is_degraded = False
-            if any(
-                s in status
-                for s in [
-                    "Error",
-                    "Failed",
-                    "CrashLoopBackOff",
-                    "OOMKilled",
-                    "ImagePullBackOff",
-                    "ErrImagePull",
-                    "InvalidImageName",
-                ]
-            ):
+            if _DEGRADED_STATUS_RE.search(status):
                 is_degraded = True
             elif status == "Unknown":
                 is_degraded = True
-            elif status == "Running" and "/" in ready:
-                r, t = ready.split("/", 1)
-                if r != t:
+            elif status == "Running":
+                r, sep, t = ready.partition("/")
+                if sep and r != t:
                     is_degraded = True
 
             if not is_degraded:
                 continue
 
             # Route to correct bucket
-            if status in (
-                "Error",
-                "Failed",
-                "Completed",
-                "OOMKilled",
-                "CrashLoopBackOff",
-                "Unknown",
-            ):
+            if status in _DELETABLE_POD_STATUSES:
                 deletable.append((pod_ns, pod_name, status))
             else:
                 # ImagePullBackOff, Pending, ContainerCreating — need manual fix
@@ -1742,10 +2203,21 @@ Note: Kubernetes MCP tools are integrated. You can manage your cluster directly
         fixed_lines: list[str] = []
         failed_lines: list[str] = []
 
-        for pod_ns, pod_name, status in deletable:
-            ok, out = await self._run_kubectl_command(
-                ["delete", "pod", pod_name, "-n", pod_ns, "--grace-period=0"]
-            )
+        # Deletes are independent, so run them side by side (bounded, to keep the
+        # number of concurrent kubectl processes reasonable)
+        limit = asyncio.Semaphore(_KUBECTL_MAX_PARALLEL)
+
+        async def delete_pod(pod_ns: str, pod_name: str) -> tuple[bool, str]:
+            async with limit:
+                return await self._run_kubectl_command(
+                    ["delete", "pod", pod_name, "-n", pod_ns, "--grace-period=0"]
+                )
+
+        results = await asyncio.gather(
+            *(delete_pod(pod_ns, pod_name) for pod_ns, pod_name, _ in deletable)
+        )
+
+        for (pod_ns, pod_name, status), (ok, out) in zip(deletable, results, strict=True):
             action = "Restarted" if status in ("CrashLoopBackOff",) else "Cleaned up"
             if ok:
                 icon = "♻️" if "Restart" in action else "🗑️"
@@ -1962,12 +2434,57 @@ Note: Kubernetes MCP tools are integrated. You can manage your cluster directly
             logger.error("alert_command_error", error=str(e))
             return f"❌ Error: {e}"
 
+    def _spawn_background(self, coro: Coroutine[Any, Any, None]) -> asyncio.Task[None]:
+        """Run *coro* as a task, holding a reference until it finishes (see drain)."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    def _forget_pending_turn(self, conversation_id: uuid.UUID, task: asyncio.Task[None]) -> None:
+        """Done-callback: unregister *task*, unless a later turn already replaced it."""
+        if self._pending_turns.get(conversation_id) is task:
+            del self._pending_turns[conversation_id]
+
+    async def drain(self) -> None:
+        """Wait for background persistence tasks; call on shutdown before closing the DB."""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+    async def _persist_turn(
+        self,
+        message: ChannelMessage,
+        conversation_id: uuid.UUID,
+        response_content: str,
+        model: str,
+        token_count: int | None,
+    ) -> None:
+        """Save an already-sent assistant reply and update the session bookkeeping."""
+        try:
+            async with get_db_session() as db_session:
+                await ContextBuilder(db_session).add_assistant_message(
+                    conversation_id,
+                    response_content,
+                    model_used=model,
+                    token_count=token_count,
+                )
+                session_mgr = SessionManager(self._get_redis_cache(), db_session)
+                await session_mgr.touch_session(message.channel_type, message.user_id)
+        except Exception as e:
+            logger.error("persist_turn_failed", error=str(e), conversation_id=str(conversation_id))
+
     async def _process_message(self, message: ChannelMessage) -> None:
         """Process regular message and generate AI response."""
+        # Listing MCP tools does not touch the database, so start it now and let it
+        # overlap with the session lookup and user-message insert below. The DB calls
+        # themselves share one AsyncSession and must stay sequential.
+        tools_prompt_task = (
+            asyncio.create_task(self._get_tools_prompt()) if self.mcp_manager else None
+        )
         try:
             async with get_db_session() as db_session:
                 # Initialize managers
-                redis_cache = RedisCache(get_redis())
+                redis_cache = self._get_redis_cache()
                 session_mgr = SessionManager(redis_cache, db_session)
                 context_builder = ContextBuilder(db_session)
                 model_selector = ModelSelector(db_session)
@@ -1977,24 +2494,27 @@ Note: Kubernetes MCP tools are integrated. You can manage your cluster directly
                     message.channel_type, message.user_id, message.username
                 )
 
-                conversation_id = uuid.UUID(session_data.conversation_id)
-                user_id = uuid.UUID(session_data.user_id)
+                conversation_id = session_data.conversation_id
+                user_id = session_data.user_id
+
+                # The previous reply may still be saving in the background; store this
+                # message after it, and with it in the context. shield() keeps a cancelled
+                # message from cancelling the other turn's save.
+                pending_turn = self._pending_turns.get(conversation_id)
+                if pending_turn is not None:
+                    await asyncio.shield(pending_turn)
 
                 # Add user message to database
                 await context_builder.add_user_message(conversation_id, message.content)
 
-                # Build conversation context
-                system_prompt = PromptManager.get_system_prompt(message.channel_type)
-
-                # Add MCP tools to system prompt if available
-                if self.mcp_manager:
+                # Build conversation context, with MCP tools in the system prompt if available
+                tools_section = ""
+                if tools_prompt_task:
                     try:
-                        tools = await self.mcp_manager.list_all_tools()
-                        if tools:
-                            tools_description = self._format_tools_for_prompt(tools)
-                            system_prompt += f'\n\nAvailable Custom Tools:\n{tools_description}\n\nTo use a tool, include in your response: TOOL_CALL: tool_name(arg1="value1", arg2="value2")'
+                        tools_section = await tools_prompt_task
                     except Exception as e:
                         logger.warning("failed_to_get_mcp_tools", error=str(e))
+                system_prompt = self._assemble_system_prompt(message.channel_type, tools_section)
 
                 context = await context_builder.build_context(
                     conversation_id, system_prompt=system_prompt
@@ -2006,7 +2526,7 @@ Note: Kubernetes MCP tools are integrated. You can manage your cluster directly
                 )
 
                 # Generate AI response
-                logger.info(
+                logger.debug(
                     "generating_ai_response",
                     model=model,
                     conversation_id=str(conversation_id),
@@ -2017,10 +2537,14 @@ Note: Kubernetes MCP tools are integrated. You can manage your cluster directly
                 )
 
                 # Check if AI wants to execute an MCP tool
-                if self.mcp_manager and "TOOL_CALL:" in response_content:
+                # Resume the tool-call parse from the marker so the response is scanned once
+                tool_call_pos = response_content.find("TOOL_CALL:") if self.mcp_manager else -1
+                if tool_call_pos >= 0:
                     logger.info("ai_requested_tool_execution")
                     try:
-                        tool_result = await self._execute_tool_from_text(response_content)
+                        tool_result = await self._execute_tool_from_text(
+                            response_content, tool_call_pos
+                        )
                         if tool_result:
                             # Add tool result to the response
                             response_content = f"{response_content}\n\n{tool_result}"
@@ -2029,31 +2553,31 @@ Note: Kubernetes MCP tools are integrated. You can manage your cluster directly
                         logger.error("tool_execution_failed", error=str(e))
                         response_content += "\n\n(Note: Tool execution failed)"
 
-                # Save assistant message
-                await context_builder.add_assistant_message(
-                    conversation_id,
-                    response_content,
-                    model_used=model,
-                    token_count=token_count,
-                )
-
-                # Update session activity
-                await session_mgr.update_session_activity(message.channel_type, message.user_id)
-                await session_mgr.increment_message_count(message.channel_type, message.user_id)
-
                 # Send response through channel
                 await self.router.send_message(
                     message.channel_type, message.user_id, response_content
                 )
 
-                logger.info(
-                    "message_processed_successfully",
-                    conversation_id=str(conversation_id),
-                    model=model,
-                    tokens=token_count,
-                )
+            # Saving the reply and session bookkeeping is not on the user's critical path,
+            # so it runs in the background on its own session. It starts only once the
+            # block above has committed, so the user and conversation rows it references
+            # are visible to that session.
+            task = self._spawn_background(
+                self._persist_turn(message, conversation_id, response_content, model, token_count)
+            )
+            self._pending_turns[conversation_id] = task
+            task.add_done_callback(functools.partial(self._forget_pending_turn, conversation_id))
+
+            logger.debug(
+                "message_processed_successfully",
+                conversation_id=str(conversation_id),
+                model=model,
+                tokens=token_count,
+            )
 
         except Exception as e:
+            if tools_prompt_task:
+                tools_prompt_task.cancel()
             logger.error(
                 "message_processing_failed",
                 error=str(e),
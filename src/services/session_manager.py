@@ -2,6 +2,7 @@
 
 import uuid
 from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
 
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,17 +14,42 @@ from src.database.repositories import ConversationRepository, UserRepository
 logger = structlog.get_logger()
 settings = get_settings()
 
-
-@dataclass
+# Count a message on a cached session, but only if the session hash is complete:
+# touching an expired key would otherwise leave a partial hash behind. Returns
+# {conversation_id, new message_count}, or nil when the session isn't cached.
+_TOUCH_SESSION_LUA = """
+local conversation_id = redis.call("HGET", KEYS[1], "conversation_id")
+if not conversation_id then
+    return nil
+end
+local count = redis.call("HINCRBY", KEYS[1], "message_count", 1)
+redis.call("HSET", KEYS[1], "last_activity", ARGV[1])
+redis.call("EXPIRE", KEYS[1], ARGV[2])
+return {conversation_id, count}
+"""
+
+
+@dataclass(slots=True)
 class SessionData:
     """Session data structure."""
 
-    conversation_id: str
-    user_id: str
+    conversation_id: uuid.UUID
+    user_id: uuid.UUID
     channel_type: str
     message_count: int
     last_activity: str
 
+    @classmethod
+    def from_cache(cls, cached: dict[str, str]) -> "SessionData":
+        """Build from a Redis session hash, whose values are all strings."""
+        return cls(
+            conversation_id=uuid.UUID(cached["conversation_id"]),
+            user_id=uuid.UUID(cached["user_id"]),
+            channel_type=cached["channel_type"],
+            message_count=int(cached["message_count"]),
+            last_activity=cached["last_activity"],
+        )
+
 
 class SessionManager:
     """Manages user sessions with Redis caching."""
@@ -46,9 +72,10 @@ class SessionManager:
 
         # Check Redis cache first
         cached = await self.cache.hgetall(cache_key)
-        if cached:
+        # A hash without conversation_id is a leftover partial write, not a session
+        if "conversation_id" in cached:
             logger.debug("session_cache_hit", channel_type=channel_type)
-            return SessionData(**cached)
+            return SessionData.from_cache(cached)
 
         # Get or create user
         user = await self.user_repo.get_or_create(channel_type, channel_user_id, username)
@@ -58,8 +85,8 @@ class SessionManager:
 
         # Create session data
         session_data = SessionData(
-            conversation_id=str(conversation.id),
-            user_id=str(user.id),
+            conversation_id=conversation.id,
+            user_id=user.id,
             channel_type=channel_type,
             message_count=0,
             last_activity=conversation.last_activity.isoformat(),
@@ -70,58 +97,120 @@ class SessionManager:
 
         logger.info(
             "session_created",
-            conversation_id=session_data.conversation_id,
-            user_id=session_data.user_id,
+            conversation_id=str(session_data.conversation_id),
+            user_id=str(session_data.user_id),
             channel_type=channel_type,
         )
 
         return session_data
 
-    async def _cache_session(self, cache_key: str, session_data: SessionData) -> None:
-        """Cache session data in Redis."""
-        session_dict = asdict(session_data)
-        for key, value in session_dict.items():
-            await self.cache.hset(cache_key, key, str(value))
-        await self.cache.expire(cache_key, settings.session_ttl_seconds)
-
-    async def update_session_activity(self, channel_type: str, channel_user_id: str) -> None:
-        """Update session last activity timestamp."""
-        cache_key = self._session_key(channel_type, channel_user_id)
-        session_data = await self.get_or_create_session(channel_type, channel_user_id)
+    async def get_user_id(
+        self, channel_type: str, channel_user_id: str, username: str | None = None
+    ) -> uuid.UUID:
+        """Get the user's ID without looking up or creating a conversation."""
+        cached_id = await self.cache.hget(
+            self._session_key(channel_type, channel_user_id), "user_id"
+        )
+        if cached_id is not None:
+            return uuid.UUID(cached_id)
 
-        # Update in database
-        await self.conversation_repo.update_activity(uuid.UUID(session_data.conversation_id))
+        user = await self.user_repo.get_or_create(channel_type, channel_user_id, username)
+        return user.id
 
-        # Update cache TTL
-        await self.cache.expire(cache_key, settings.session_ttl_seconds)
+    async def _cache_session(self, cache_key: str, session_data: SessionData) -> None:
+        """Cache session data in Redis."""
+        # One multi-field HSET plus the TTL, sent in one round-trip and applied atomically
+        pipe = self.cache.pipeline()
+        pipe.hset(
+            cache_key, mapping={key: str(value) for key, value in asdict(session_data).items()}
+        )
+        pipe.expire(cache_key, settings.session_ttl_seconds)
+        await pipe.execute()
 
     async def increment_message_count(self, channel_type: str, channel_user_id: str) -> int:
         """Increment message count in session."""
         cache_key = self._session_key(channel_type, channel_user_id)
-        count_str = await self.cache.hget(cache_key, "message_count")
-        count = int(count_str) if count_str else 0
-        count += 1
-        await self.cache.hset(cache_key, "message_count", str(count))
-        return count
+        # HINCRBY is atomic, so concurrent messages cannot lose an increment
+        pipe = self.cache.pipeline()
+        pipe.hincrby(cache_key, "message_count", 1)
+        pipe.expire(cache_key, settings.session_ttl_seconds)
+        count, _ = await pipe.execute()
+        return int(count)
+
+    async def touch_session(self, channel_type: str, channel_user_id: str) -> int:
+        """
+        Record one more message on a session: bump its count, stamp its activity
+        time and refresh its TTL in Redis, then update the conversation in the DB.
+
+        Args:
+            channel_type: Channel type (telegram, slack)
+            channel_user_id: User identifier within the channel
+
+        Returns:
+            New message count
+        """
+        cache_key = self._session_key(channel_type, channel_user_id)
+
+        # All session bookkeeping in one round-trip, applied atomically and only to a
+        # complete session hash. The shared RedisCache keeps the registered script, so
+        # its SHA is only computed once per process
+        touched = await self.cache.register_script(_TOUCH_SESSION_LUA)(
+            keys=[cache_key],
+            args=[datetime.now(UTC).isoformat(), settings.session_ttl_seconds],
+        )
+
+        if touched is None:
+            # The session expired: re-cache the full session and count this message on it
+            session_data = await self.get_or_create_session(channel_type, channel_user_id)
+            conversation_id = session_data.conversation_id
+            count = await self.increment_message_count(channel_type, channel_user_id)
+        else:
+            cached_id, count = touched
+            conversation_id = uuid.UUID(cached_id)
+
+        await self.conversation_repo.update_activity(conversation_id)
+        return int(count)
+
+    async def _get_conversation_id_fast(
+        self, channel_type: str, channel_user_id: str
+    ) -> uuid.UUID | None:
+        """Read only the cached conversation ID, or None when the session isn't cached."""
+        cached_id = await self.cache.hget(
+            self._session_key(channel_type, channel_user_id), "conversation_id"
+        )
+        return uuid.UUID(cached_id) if cached_id is not None else None
 
     async def clear_session(self, channel_type: str, channel_user_id: str) -> None:
         """Clear session cache and deactivate conversation."""
         cache_key = self._session_key(channel_type, channel_user_id)
-        session_data = await self.get_or_create_session(channel_type, channel_user_id)
+        conversation_id = await self._get_conversation_id_fast(channel_type, channel_user_id)
+        if conversation_id is None:
+            # Cold cache: find the active conversation rather than creating one to deactivate
+            user = await self.user_repo.get_by_channel_user(channel_type, channel_user_id)
+            conversation = (
+                await self.conversation_repo.get_active_by_user(user.id, channel_type)
+                if user
+                else None
+            )
+            conversation_id = conversation.id if conversation else None
 
         # Deactivate conversation
-        await self.conversation_repo.deactivate(uuid.UUID(session_data.conversation_id))
+        if conversation_id is not None:
+            await self.conversation_repo.deactivate(conversation_id)
 
         # Clear cache
         await self.cache.delete(cache_key)
 
         logger.info(
             "session_cleared",
-            conversation_id=session_data.conversation_id,
+            conversation_id=str(conversation_id) if conversation_id else None,
             channel_type=channel_type,
         )
 
     async def get_conversation_id(self, channel_type: str, channel_user_id: str) -> uuid.UUID:
         """Get conversation ID for a session."""
-        session_data = await self.get_or_create_session(channel_type, channel_user_id)
-        return uuid.UUID(session_data.conversation_id)
+        conversation_id = await self._get_conversation_id_fast(channel_type, channel_user_id)
+        if conversation_id is None:
+            session_data = await self.get_or_create_session(channel_type, channel_user_id)
+            conversation_id = session_data.conversation_id
+        return conversation_id
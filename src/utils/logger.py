@@ -1,11 +1,28 @@
 """Logging configuration."""
 
+import atexit
 import logging
 import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 import structlog
 
+# Background thread that writes queued log records; see configure_logging
+_listener: QueueListener | None = None
+
+
+def _stop_listener() -> None:
+    """Flush queued records and stop the listener thread, if one is running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
 
 def configure_logging(log_level: str = "INFO") -> None:
     """Configure structured logging.
@@ -13,12 +30,25 @@ def configure_logging(log_level: str = "INFO") -> None:
     Uses JSON format when not attached to a TTY (containers, CI) or when
     LOG_FORMAT=json is explicitly set.  Falls back to the human-readable
     ConsoleRenderer for interactive development sessions.
+
+    All records, structlog's included, are only enqueued by the calling thread;
+    a QueueListener thread does the stdout writes, so logging never blocks the
+    event loop on I/O.
     """
-    # Configure standard logging
+    global _listener
+    _stop_listener()
+
+    # Configure standard logging: the root logger's only handler feeds the queue
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
     logging.basicConfig(
         format="%(message)s",
-        stream=sys.stdout,
         level=getattr(logging, log_level.upper()),
+        handlers=[QueueHandler(log_queue)],
+        force=True,
     )
 
     # Choose renderer based on environment
@@ -38,11 +68,12 @@ def configure_logging(log_level: str = "INFO") -> None:
         else structlog.dev.ConsoleRenderer(colors=True)
     )
 
-    # Configure structlog
+    # Configure structlog. The filtering wrapper turns calls below log_level into
+    # no-ops, and caching makes each module logger resolve this config only once.
     structlog.configure(
         processors=shared_processors + [final_processor],
         wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, log_level.upper())),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
-        cache_logger_on_first_use=False,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        cache_logger_on_first_use=True,
     )
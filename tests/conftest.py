@@ -8,33 +8,62 @@ collect_ignore = ["test_production_readiness.py"]
 
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 
 from src.database.models import Base
 
 
+@compiles(UUID, "sqlite")
+def _compile_uuid_for_sqlite(type_, compiler, **kw):
+    """Store the models' PostgreSQL UUID columns as CHAR(32) hex in the SQLite test DB."""
+    return "CHAR(32)"
+
+
 @pytest.fixture(scope="session")
 def anyio_backend():
     """Use asyncio backend for pytest-asyncio."""
     return "asyncio"
 
 
-@pytest_asyncio.fixture
-async def db_session():
-    """Create test database session."""
-    # Use in-memory SQLite for tests
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def db_engine():
+    """Create the test database engine and tables once per test run."""
+    # Use in-memory SQLite for tests (one shared connection, so the schema persists)
     engine = create_async_engine("sqlite+aiosqlite:///:memory:")
 
+    # pysqlite's implicit transactions break SAVEPOINT; let SQLAlchemy emit BEGIN itself
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_implicit_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     # Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    # Create session factory
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with async_session() as session:
-        yield session
+    yield engine
 
     # Cleanup
     await engine.dispose()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def db_session(db_engine):
+    """Create test database session, rolled back after the test."""
+    async with db_engine.connect() as conn:
+        transaction = await conn.begin()
+        # session.commit() only releases a SAVEPOINT, so the outer rollback undoes everything
+        async_session = async_sessionmaker(
+            bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        )
+
+        async with async_session() as session:
+            yield session
+
+        await transaction.rollback()
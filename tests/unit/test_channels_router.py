@@ -30,6 +30,12 @@ class TestChannelMessage:
         assert "telegram" in r
         assert "U999" in r
 
+    def test_uses_slots(self):
+        msg = ChannelMessage(content="x", user_id="U1")
+        assert not hasattr(msg, "__dict__")
+        with pytest.raises(AttributeError):
+            msg.thread_ts = "123"
+
 
 # ── Concrete stub adapter ─────────────────────────────────────────────────────
 
@@ -0,0 +1,1086 @@
+"""Unit tests for MessageHandler query routing and formatting helpers."""
+
+import asyncio
+import contextlib
+import re
+import time
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.channels.base import ChannelMessage
+from src.k8s.client import KubernetesClient
+from src.services.message_handler import (
+    _CERT_RE,
+    _FULL_SCAN_RE,
+    _HEADERS_RE,
+    _K8S_INTENT_RE,
+    _MTLS_RE,
+    _OWASP_RE,
+    _POD_STATUS_FILTER_RE,
+    _WAF_RE,
+    MessageHandler,
+    _extract_namespace,
+    _kubectl_cache_key,
+    _match_intents,
+    _pod_dict_to_row,
+    _pod_line_matches,
+    _tail_lines,
+)
+
+
+def _make_handler(mcp_manager=None) -> MessageHandler:
+    router = MagicMock()
+    router.send_message = AsyncMock(return_value=True)
+    return MessageHandler(router=router, ai_client=MagicMock(), mcp_manager=mcp_manager)
+
+
+def _text_result(text: str, is_error: bool = False) -> dict:
+    return {"content": [{"type": "text", "text": text}], "isError": is_error}
+
+
+# ── Query classification ──────────────────────────────────────────────────────
+
+
+class TestQueryDetection:
+    def test_kubernetes_keyword_detected(self):
+        assert _make_handler()._is_kubernetes_query("show me the pods please")
+
+    def test_kubernetes_multiword_keyword_detected(self):
+        assert _make_handler()._is_kubernetes_query("what is the root cause here")
+
+    def test_chitchat_is_not_kubernetes(self):
+        assert not _make_handler()._is_kubernetes_query("hello, how are you today?")
+
+    def test_security_keyword_detected(self):
+        assert _make_handler()._is_security_query("check certificate for example.com")
+
+    def test_chitchat_is_not_security(self):
+        assert not _make_handler()._is_security_query("tell me a joke")
+
+
+# ── Tool calls embedded in AI responses ───────────────────────────────────────
+
+
+class TestExecuteToolFromText:
+    async def test_no_tool_call_returns_none(self):
+        handler = _make_handler(mcp_manager=MagicMock())
+        assert await handler._execute_tool_from_text("just a normal answer") is None
+
+    async def test_parses_arguments_and_formats_result(self):
+        mcp = MagicMock()
+        mcp.call_tool = AsyncMock(return_value=_text_result("443 open"))
+        handler = _make_handler(mcp_manager=mcp)
+
+        result = await handler._execute_tool_from_text(
+            "Sure. TOOL_CALL: scan_ports(target=\"example.com\", ports='443')"
+        )
+
+        mcp.call_tool.assert_awaited_once_with(
+            "scan_ports", {"target": "example.com", "ports": "443"}
+        )
+        assert result == "Tool 'scan_ports' result:\n443 open"
+
+    async def test_quoted_values_may_contain_commas(self):
+        mcp = MagicMock()
+        mcp.call_tool = AsyncMock(return_value=_text_result("ok"))
+        handler = _make_handler(mcp_manager=mcp)
+
+        await handler._execute_tool_from_text(
+            "TOOL_CALL: scan_ports(target='example.com', ports=\"80, 443\", verbose = yes)"
+        )
+
+        mcp.call_tool.assert_awaited_once_with(
+            "scan_ports", {"target": "example.com", "ports": "80, 443", "verbose": "yes"}
+        )
+
+    async def test_hyphenated_keys_are_kept(self):
+        mcp = MagicMock()
+        mcp.call_tool = AsyncMock(return_value=_text_result("ok"))
+        handler = _make_handler(mcp_manager=mcp)
+
+        await handler._execute_tool_from_text("TOOL_CALL: apply(dry-run=true, name=web)")
+
+        mcp.call_tool.assert_awaited_once_with("apply", {"dry-run": "true", "name": "web"})
+
+    async def test_unbalanced_quote_is_stripped_from_bare_value(self):
+        mcp = MagicMock()
+        mcp.call_tool = AsyncMock(return_value=_text_result("ok"))
+        handler = _make_handler(mcp_manager=mcp)
+
+        await handler._execute_tool_from_text(
+            "TOOL_CALL: scan_ports(target=\"example.com, ports=443')"
+        )
+
+        mcp.call_tool.assert_awaited_once_with(
+            "scan_ports", {"target": "example.com", "ports": "443"}
+        )
+
+    async def test_scan_starts_at_given_offset(self):
+        mcp = MagicMock()
+        mcp.call_tool = AsyncMock(return_value=_text_result("ok"))
+        handler = _make_handler(mcp_manager=mcp)
+        text = "TOOL_CALL: skipped() then TOOL_CALL: used()"
+
+        await handler._execute_tool_from_text(text, text.index("then"))
+
+        mcp.call_tool.assert_awaited_once_with("used", {})
+
+    async def test_error_result_is_reported(self):
+        mcp = MagicMock()
+        mcp.call_tool = AsyncMock(return_value=_text_result("boom", is_error=True))
+        handler = _make_handler(mcp_manager=mcp)
+
+        result = await handler._execute_tool_from_text("TOOL_CALL: broken()")
+
+        assert result == "Tool 'broken' failed: boom"
+
+    async def test_multiple_calls_run_concurrently_in_order(self):
+        started = asyncio.Event()
+        both_started = asyncio.Event()
+
+        async def call_tool(name, args):
+            if started.is_set():
+                both_started.set()
+            started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return _text_result(name.upper())
+
+        mcp = MagicMock()
+        mcp.call_tool = call_tool
+        handler = _make_handler(mcp_manager=mcp)
+
+        result = await handler._execute_tool_from_text("TOOL_CALL: a() TOOL_CALL: b()")
+
+        assert result == "Tool 'a' result:\nA\n\nTool 'b' result:\nB"
+
+    async def test_raising_call_is_reported_without_losing_others(self):
+        mcp = MagicMock()
+        mcp.call_tool = AsyncMock(side_effect=[RuntimeError("down"), _text_result("ok")])
+        handler = _make_handler(mcp_manager=mcp)
+
+        result = await handler._execute_tool_from_text("TOOL_CALL: a() TOOL_CALL: b()")
+
+        assert result == "Tool 'a' failed: down\n\nTool 'b' result:\nok"
+
+
+# ── kubectl table formatting ──────────────────────────────────────────────────
+
+PODS_ALL_NS = """NAMESPACE   NAME        READY   STATUS             RESTARTS   AGE
+default     web-1       1/1     Running            0          1d
+default     web-2       0/1     CrashLoopBackOff   12         1d
+jobs        batch-1     0/1     Completed          0          2h"""
+
+DEPLOYMENTS = """NAME   READY   UP-TO-DATE   AVAILABLE   AGE
+api    2/2     2            2           5d
+web    1/3     3            1           5d"""
+
+
+class TestFormatKubectlTable:
+    def test_pods_with_namespace_column(self):
+        out = _make_handler()._format_kubectl_table(PODS_ALL_NS, "pods")
+        blocks = out.split("\n\n")
+        assert len(blocks) == 3
+        assert blocks[0].startswith("✅ `default/web-1`")
+        assert blocks[1].startswith("❌ `default/web-2`")
+        assert "Restarts: 12" in blocks[1]
+        assert blocks[2].startswith("✔️ `jobs/batch-1`")
+
+    def test_pods_without_namespace_column(self):
+        output = "NAME READY STATUS RESTARTS AGE\nweb-1 0/1 Pending 0 1m"
+        out = _make_handler()._format_kubectl_table(output, "pods")
+        assert out == "⏳ **web-1**\n   Status: Pending | Ready: 0/1 | Restarts: 0 | Age: 1m"
+
+    def test_deployments_flag_partial_rollouts(self):
+        out = _make_handler()._format_kubectl_table(DEPLOYMENTS, "deployments")
+        blocks = out.split("\n\n")
+        assert blocks[0].startswith("✅ **api**")
+        assert blocks[1].startswith("⚠️ **web**")
+
+    def test_header_only_returns_output_unchanged(self):
+        output = "NAME READY STATUS RESTARTS AGE"
+        assert _make_handler()._format_kubectl_table(output, "pods") == output
+
+
+# ── Follow-up detection ───────────────────────────────────────────────────────
+
+
+class TestK8sFollowup:
+    @pytest.mark.parametrize("text", ["hello there", "pods in kube-system namespace please show"])
+    async def test_non_followups_return_none(self, text):
+        handler = _make_handler()
+        msg = ChannelMessage(content=text, user_id="U1", channel_type="slack")
+        assert await handler._get_k8s_followup_query(msg) is None
+
+
+# ── Pod status filters ────────────────────────────────────────────────────────
+
+
+class TestPodLineMatches:
+    RUNNING_OK = "default  web-1  1/1  Running  0  1d"
+    RUNNING_DEGRADED = "default  web-2  0/1  Running  3  1d"
+    CRASHING = "default  web-3  0/1  CrashLoopBackOff  9  1d"
+    PENDING = "default  web-4  0/1  Pending  0  1m"
+
+    def test_problem_filter(self):
+        assert not _pod_line_matches(self.RUNNING_OK, "problem")
+        assert _pod_line_matches(self.RUNNING_DEGRADED, "problem")
+        assert _pod_line_matches(self.CRASHING, "problem")
+        assert _pod_line_matches("default  web-5  0/1  ErrImagePull  0  1m", "problem")
+
+    def test_notready_filter(self):
+        assert not _pod_line_matches(self.RUNNING_OK, "notready")
+        assert _pod_line_matches(self.RUNNING_DEGRADED, "notready")
+        assert _pod_line_matches(self.PENDING, "notready")
+
+    def test_pending_filter(self):
+        assert _pod_line_matches(self.PENDING, "pending")
+        assert not _pod_line_matches(self.CRASHING, "pending")
+
+    def test_running_filter_requires_all_containers_ready(self):
+        assert _pod_line_matches(self.RUNNING_OK, "running")
+        assert not _pod_line_matches(self.RUNNING_DEGRADED, "running")
+        assert not _pod_line_matches(self.PENDING, "running")
+
+    def test_all_filter_keeps_everything(self):
+        assert _pod_line_matches(self.CRASHING, "all")
+
+
+# ── kubectl subprocess helpers ────────────────────────────────────────────────
+
+
+@pytest.fixture
+def fake_kubectl(tmp_path, monkeypatch):
+    """Install a stub `kubectl` on PATH that prints $FAKE_STDOUT and exits $FAKE_RC."""
+    script = tmp_path / "kubectl"
+    script.write_text(
+        "#!/bin/sh\n"
+        'if [ -n "$FAKE_SLEEP" ]; then exec sleep "$FAKE_SLEEP"; fi\n'
+        'printf "%b" "$FAKE_STDOUT"\n'
+        'printf "%b" "$FAKE_STDERR" >&2\n'
+        'exit "${FAKE_RC:-0}"\n'
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}:/usr/bin:/bin")
+    # No cluster config: pod listings fall back to the kubectl subprocess
+    monkeypatch.setattr(
+        "src.services.message_handler.get_k8s_client",
+        AsyncMock(return_value=MagicMock(is_available=False)),
+    )
+    return monkeypatch
+
+
+class TestIterKubectlLines:
+    async def test_yields_stdout_lines(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDOUT", "NAME READY\\nweb-1 1/1\\n")
+        handler = _make_handler()
+        lines = [line async for line in handler._iter_kubectl_lines(["get", "pods"])]
+        assert lines == ["NAME READY", "web-1 1/1"]
+
+    async def test_nonzero_exit_raises_with_stderr(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDERR", "forbidden\\n")
+        fake_kubectl.setenv("FAKE_RC", "1")
+        handler = _make_handler()
+        with pytest.raises(RuntimeError, match="forbidden"):
+            async for _ in handler._iter_kubectl_lines(["get", "pods"]):
+                pass
+
+
+class TestRunKubectlCommand:
+    async def test_success_keeps_leading_indentation(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDOUT", "  at main()\\n  at run()\\n\\n")
+        ok, output = await _make_handler()._run_kubectl_command(["logs", "web-1"])
+        assert (ok, output) == (True, "  at main()\n  at run()")
+
+    async def test_invalid_utf8_is_replaced_not_raised(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDOUT", "caf\\0351!\\n")
+        ok, output = await _make_handler()._run_kubectl_command(["logs", "web-1"])
+        assert (ok, output) == (True, "caf\ufffd!")
+
+    async def test_hung_kubectl_is_killed_after_timeout(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_SLEEP", "30")
+        fake_kubectl.setattr("src.services.message_handler._KUBECTL_TIMEOUT", 0.2)
+
+        ok, output = await _make_handler()._run_kubectl_command(["get", "pods"])
+
+        assert not ok
+        assert "did not finish" in output
+
+    async def test_hung_streaming_kubectl_is_killed_after_timeout(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_SLEEP", "30")
+        fake_kubectl.setattr("src.services.message_handler._KUBECTL_TIMEOUT", 0.2)
+
+        with pytest.raises(RuntimeError, match="did not finish"):
+            async for _ in _make_handler()._iter_kubectl_lines(["get", "pods"]):
+                pass
+
+    async def test_concurrent_identical_reads_share_one_subprocess(self, fake_kubectl):
+        handler = _make_handler()
+        handler._exec_kubectl_command = AsyncMock(return_value=(True, "NAME"))
+
+        results = await asyncio.gather(
+            *(handler._run_kubectl_command(["get", "pods"]) for _ in range(5))
+        )
+
+        assert results == [(True, "NAME")] * 5
+        handler._exec_kubectl_command.assert_awaited_once()
+        assert handler._kubectl_inflight == {}
+
+    async def test_mutating_commands_are_not_coalesced(self, fake_kubectl):
+        handler = _make_handler()
+        handler._exec_kubectl_command = AsyncMock(return_value=(True, "deleted"))
+
+        await asyncio.gather(
+            *(handler._run_kubectl_command(["delete", "pod", "web-1"]) for _ in range(2))
+        )
+
+        assert handler._exec_kubectl_command.await_count == 2
+
+    async def test_failure_returns_stderr(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDERR", "not found\\n")
+        fake_kubectl.setenv("FAKE_RC", "1")
+        assert await _make_handler()._run_kubectl_command(["get", "pod", "x"]) == (
+            False,
+            "not found",
+        )
+
+
+class TestKubernetesPodQuery:
+    async def test_default_listing_reports_problem_pods(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDOUT", PODS_ALL_NS + "\\n")
+        handler = _make_handler()
+        msg = ChannelMessage(content="show me pods", user_id="U1", channel_type="slack")
+
+        await handler._handle_kubernetes_query(msg)
+
+        response = handler.router.send_message.await_args.args[2]
+        assert response.startswith("⚠️ **Problem pods (all namespaces)** (1 issue(s), 1 healthy)")
+        assert "`default/web-2`" in response
+
+    async def test_kubectl_failure_is_reported(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDERR", "connection refused\\n")
+        fake_kubectl.setenv("FAKE_RC", "1")
+        handler = _make_handler()
+        msg = ChannelMessage(content="show error pods", user_id="U1", channel_type="slack")
+
+        await handler._handle_kubernetes_query(msg)
+
+        response = handler.router.send_message.await_args.args[2]
+        assert response == "❌ Error getting pods: connection refused"
+
+
+class TestKubectlCache:
+    def test_only_read_verbs_are_cacheable(self):
+        assert _kubectl_cache_key(["get", "pods", "-A"]) is not None
+        assert _kubectl_cache_key(["logs", "web-1", "-n", "default"]) is not None
+        assert _kubectl_cache_key(["scale", "deployment", "web", "--replicas=2"]) is None
+        assert _kubectl_cache_key(["delete", "pod", "web-1"]) is None
+
+    def test_key_distinguishes_argument_boundaries(self):
+        assert _kubectl_cache_key(["get", "pods", "a b"]) != _kubectl_cache_key(
+            ["get", "pods", "a", "b"]
+        )
+
+    async def test_cache_hit_skips_subprocess(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_RC", "1")  # would fail if kubectl actually ran
+        handler = _make_handler()
+        handler._get_cached_kubectl_output = AsyncMock(return_value="NAME\nweb-1")
+
+        assert await handler._run_kubectl_command(["get", "pods"]) == (True, "NAME\nweb-1")
+        lines = [line async for line in handler._iter_kubectl_lines(["get", "pods"])]
+        assert lines == ["NAME", "web-1"]
+
+    async def test_successful_read_is_cached(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDOUT", "NAME\\nweb-1\\n")
+        handler = _make_handler()
+        handler._cache_kubectl_output = AsyncMock()
+
+        await handler._run_kubectl_command(["get", "pods"])
+
+        handler._cache_kubectl_output.assert_awaited_once_with(
+            _kubectl_cache_key(["get", "pods"]), "NAME\nweb-1", 0
+        )
+
+    async def test_uncached_read_bypasses_cache(self, fake_kubectl):
+        fake_kubectl.setenv("FAKE_STDOUT", "NAME\nweb-2\n")
+        handler = _make_handler()
+        handler._get_cached_kubectl_output = AsyncMock(return_value="NAME\nweb-1")
+        handler._cache_kubectl_output = AsyncMock()
+
+        assert await handler._run_kubectl_command(["get", "pods"], use_cache=False) == (
+            True,
+            "NAME\nweb-2",
+        )
+        handler._get_cached_kubectl_output.assert_not_awaited()
+        handler._cache_kubectl_output.assert_not_awaited()
+
+    async def test_mutation_drops_cached_reads(self, fake_kubectl, monkeypatch):
+        cache = MagicMock()
+        cache.smembers = AsyncMock(return_value={"kubectl:a", "kubectl:b"})
+        cache.delete = AsyncMock()
+        handler = _make_handler()
+        monkeypatch.setattr(handler, "_get_redis_cache", lambda: cache)
+
+        await handler._run_kubectl_command(["delete", "pod", "web-1"])
+
+        assert handler._kubectl_generation == 1
+        keys = cache.delete.await_args.args
+        assert sorted(keys) == ["kubectl:a", "kubectl:b", "kubectl:keys"]
+
+    async def test_read_overtaken_by_mutation_is_not_cached(self, monkeypatch):
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        handler = _make_handler()
+        monkeypatch.setattr(handler, "_get_redis_cache", lambda: MagicMock(pipeline=lambda: pipe))
+        handler._kubectl_generation = 1
+
+        await handler._cache_kubectl_output("kubectl:a", "stale", generation=0)
+        pipe.execute.assert_not_awaited()
+
+        await handler._cache_kubectl_output("kubectl:a", "fresh", generation=1)
+        pipe.set.assert_called_once_with("kubectl:a", "fresh", ex=10)
+        pipe.sadd.assert_called_once_with("kubectl:keys", "kubectl:a")
+
+
+class TestIntentClassifier:
+    def test_reports_every_intent_present(self):
+        intents = _match_intents(_K8S_INTENT_RE, "restart the pod and show events")
+        assert intents == {"pods", "events", "restart"}
+
+    def test_overlapping_keywords_are_all_seen(self):
+        # "unhealthy" also contains "healthy"; the status branch order picks notready
+        assert _match_intents(_POD_STATUS_FILTER_RE, "show unhealthy pods") == {
+            "notready",
+            "running",
+        }
+
+    def test_fix_phrase_takes_priority_over_pods(self):
+        assert "fix" in _match_intents(_K8S_INTENT_RE, "please fix these pods")
+
+
+class TestExtractNamespace:
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("show pods in kube-system namespace", "kube-system"),
+            ("pods in the velero namespace", "velero"),
+            ("pos-order4u namespace pods", "pos-order4u"),
+            ("logs from pod api-1 -n prod", "prod"),
+            ("pods namespace foo", "foo"),
+            ("show all pods in namespace monitoring", "monitoring"),
+            ("show error pods", None),
+        ],
+    )
+    def test_extract_namespace(self, query, expected):
+        assert _extract_namespace(query) == expected
+
+
+def _api_pod(
+    *,
+    phase="Running",
+    reason=None,
+    deleting=False,
+    containers=(),
+    init_containers=(),
+):
+    """Build a minimal kubernetes-asyncio V1Pod stand-in for KubernetesClient._pod_to_dict."""
+
+    def _status(state, ready=False):
+        return SimpleNamespace(state=state, ready=ready, restart_count=0, last_state=None)
+
+    return SimpleNamespace(
+        metadata=SimpleNamespace(
+            name="web-1",
+            namespace="default",
+            labels={},
+            creation_timestamp=datetime(2024, 1, 1, tzinfo=UTC),
+            deletion_timestamp=datetime.now(UTC) if deleting else None,
+        ),
+        spec=SimpleNamespace(
+            containers=[object()] * len(containers),
+            init_containers=[object()] * len(init_containers),
+            node_name="node-a",
+        ),
+        status=SimpleNamespace(
+            phase=phase,
+            reason=reason,
+            container_statuses=[_status(*c) for c in containers],
+            init_container_statuses=[_status(*c) for c in init_containers],
+        ),
+    )
+
+
+def _state(running=False, waiting=None, terminated=None):
+    return SimpleNamespace(
+        running=SimpleNamespace() if running else None,
+        waiting=SimpleNamespace(reason=waiting) if waiting else None,
+        terminated=(
+            SimpleNamespace(reason=terminated[0], exit_code=terminated[1], signal=0)
+            if terminated
+            else None
+        ),
+    )
+
+
+class TestPodDictToRow:
+    def _row(self, pod) -> str:
+        return _pod_dict_to_row(KubernetesClient._pod_to_dict(pod), with_namespace=True)
+
+    def test_deleting_pod_shows_terminating(self):
+        row = self._row(_api_pod(deleting=True, containers=[(_state(running=True), True)]))
+
+        assert row.split()[3] == "Terminating"
+        assert _pod_line_matches(row, "problem")
+        assert not _pod_line_matches(row, "running")
+
+    def test_running_pod_row(self):
+        row = self._row(_api_pod(containers=[(_state(running=True), True)]))
+
+        assert row.split()[:4] == ["default", "web-1", "1/1", "Running"]
+        assert not _pod_line_matches(row, "problem")
+
+    def test_evicted_pod_uses_status_reason(self):
+        row = self._row(_api_pod(phase="Failed", reason="Evicted"))
+
+        assert row.split()[3] == "Evicted"
+
+    def test_completed_pod_uses_terminated_reason(self):
+        row = self._row(
+            _api_pod(phase="Succeeded", containers=[(_state(terminated=("Completed", 0)),)])
+        )
+
+        assert row.split()[3] == "Completed"
+
+    @pytest.mark.parametrize(
+        ("init_state", "expected"),
+        [
+            (_state(waiting="PodInitializing"), "Init:0/1"),
+            (_state(waiting="ImagePullBackOff"), "Init:ImagePullBackOff"),
+            (_state(terminated=("Error", 1)), "Init:Error"),
+        ],
+    )
+    def test_init_container_states(self, init_state, expected):
+        pod = _api_pod(
+            phase="Pending",
+            init_containers=[(init_state,)],
+            containers=[(_state(waiting="PodInitializing"),)],
+        )
+
+        assert self._row(pod).split()[3] == expected
+
+
+class TestPodQueryViaApiClient:
+    @pytest.fixture
+    def k8s(self, monkeypatch):
+        client = MagicMock(is_available=True)
+        client.list_all_pods = AsyncMock(
+            return_value=[
+                {
+                    "name": "web-1",
+                    "namespace": "default",
+                    "status": "Running",
+                    "display_status": "Running",
+                    "ready": "1/1",
+                    "restarts": 0,
+                    "age": "2024-01-01 00:00:00+00:00",
+                },
+                {
+                    "name": "web-2",
+                    "namespace": "default",
+                    "status": "CrashLoopBackOff",
+                    "display_status": "CrashLoopBackOff",
+                    "ready": "0/1",
+                    "restarts": 7,
+                    "age": "2024-01-01 00:00:00+00:00",
+                },
+            ]
+        )
+        client.list_pods = AsyncMock(side_effect=RuntimeError("boom"))
+        client.list_nodes = AsyncMock(
+            return_value=[
+                {
+                    "name": "node-a",
+                    "status": "Ready",
+                    "unschedulable": True,
+                    "roles": "control-plane",
+                    "version": "v1.30.2",
+                    "age": "2024-01-01 00:00:00+00:00",
+                }
+            ]
+        )
+        monkeypatch.setattr(
+            "src.services.message_handler.get_k8s_client", AsyncMock(return_value=client)
+        )
+        return client
+
+    async def test_all_namespaces_listing_uses_api(self, k8s):
+        handler = _make_handler()
+        msg = ChannelMessage(content="show me pods", user_id="U1", channel_type="slack")
+
+        await handler._handle_kubernetes_query(msg)
+
+        k8s.list_all_pods.assert_awaited_once()
+        response = handler.router.send_message.await_args.args[2]
+        assert "(1 issue(s), 1 healthy)" in response
+        assert "❌ `default/web-2`" in response
+        assert "Restarts: 7" in response
+
+    async def test_api_error_is_reported(self, k8s):
+        handler = _make_handler()
+        msg = ChannelMessage(
+            content="show pods in prod namespace", user_id="U1", channel_type="slack"
+        )
+
+        await handler._handle_kubernetes_query(msg)
+
+        k8s.list_pods.assert_awaited_once_with("prod")
+        assert handler.router.send_message.await_args.args[2] == "❌ Error getting pods: boom"
+
+    async def test_k8s_pods_command_uses_api(self, k8s):
+        handler = _make_handler()
+        handler._run_kubectl_command = AsyncMock()
+
+        response = await handler._handle_k8s_command(["pods"])
+
+        handler._run_kubectl_command.assert_not_awaited()
+        assert response.startswith("📦 **Pods (all namespaces):**")
+        assert "`default/web-2`" in response
+
+    async def test_k8s_pods_command_reports_api_error(self, k8s):
+        handler = _make_handler()
+
+        response = await handler._handle_k8s_command(["pods", "prod"])
+
+        assert response == "❌ Error getting pods: boom"
+
+    async def test_k8s_nodes_command_uses_api(self, k8s):
+        handler = _make_handler()
+        handler._run_kubectl_command = AsyncMock()
+
+        response = await handler._handle_k8s_command(["nodes"])
+
+        handler._run_kubectl_command.assert_not_awaited()
+        assert "❌ **node-a**" in response
+        assert (
+            "Status: Ready,SchedulingDisabled | Role: control-plane | Version: v1.30.2" in response
+        )
+        # Relative age like `kubectl get nodes`, not the raw creation timestamp
+        assert re.search(r"\| Age: \d+d$", response)
+
+    async def test_k8s_pods_command_shows_terminating_pods(self, k8s):
+        k8s.list_all_pods.return_value = [
+            KubernetesClient._pod_to_dict(
+                _api_pod(deleting=True, containers=[(_state(running=True), True)])
+            )
+        ]
+        handler = _make_handler()
+
+        response = await handler._handle_k8s_command(["pods"])
+
+        assert "Status: Terminating | Ready: 1/1" in response
+
+
+class TestSecurityPatterns:
+    @pytest.mark.parametrize(
+        ("pattern", "query", "host"),
+        [
+            (_CERT_RE, "check ssl certificate for lobehub.com", "lobehub.com"),
+            (_WAF_RE, "detect cdn for site.com", "site.com"),
+            (_WAF_RE, "check waf protection for site.com", "site.com"),
+            (_MTLS_RE, "check mtls on api.example.com", "api.example.com"),
+            (_HEADERS_RE, "check security headers for example.com", "example.com"),
+            (_OWASP_RE, "scan owasp vulnerabilities on example.com", "example.com"),
+            (_FULL_SCAN_RE, "full security scan on example.com", "example.com"),
+        ],
+    )
+    def test_host_is_captured(self, pattern, query, host):
+        assert pattern.search(query).group(1) == host
+
+    @pytest.mark.parametrize(
+        "query",
+        [" " * 5000 + "x", "cert" + " " * 5000 + "!", "owasp" + " " * 5000 + "!"],
+    )
+    def test_long_whitespace_does_not_backtrack(self, query):
+        start = time.perf_counter()
+        for pattern in (_CERT_RE, _WAF_RE, _MTLS_RE, _HEADERS_RE, _OWASP_RE, _FULL_SCAN_RE):
+            assert pattern.search(query) is None
+        assert time.perf_counter() - start < 0.5
+
+
+class TestSecurityQueryRouting:
+    @pytest.fixture
+    def mcp(self):
+        mcp = MagicMock()
+        mcp.list_all_tools = AsyncMock(
+            return_value=[{"name": "scan_ports", "_server": "simplePortChecker"}]
+        )
+        mcp.call_tool = AsyncMock(return_value=_text_result("done"))
+        return mcp
+
+    @pytest.mark.parametrize(
+        ("query", "tool", "arguments"),
+        [
+            (
+                "is port 443 open on lobehub.com",
+                "scan_ports",
+                {"target": "lobehub.com", "ports": [443]},
+            ),
+            ("check certificate for example.com", "analyze_certificate", {"target": "example.com"}),
+            # port takes priority over the certificate intent
+            ("check cert for port 443 on a.io", "scan_ports", {"target": "a.io", "ports": [443]}),
+            ("full security scan on example.com", "full_security_scan", {"target": "example.com"}),
+        ],
+    )
+    async def test_routes_to_tool(self, mcp, query, tool, arguments):
+        handler = _make_handler(mcp_manager=mcp)
+        msg = ChannelMessage(content=query, user_id="U1", channel_type="slack")
+
+        await handler._handle_security_query(msg)
+
+        mcp.call_tool.assert_awaited_once_with(tool, arguments)
+
+    async def test_unmatched_query_shows_help(self, mcp):
+        handler = _make_handler(mcp_manager=mcp)
+        msg = ChannelMessage(content="what security can you do", user_id="U1", channel_type="slack")
+
+        await handler._handle_security_query(msg)
+
+        mcp.call_tool.assert_not_awaited()
+        response = handler.router.send_message.await_args.args[2]
+        assert "I have 1 security tools from SimplePortChecker" in response
+        assert response.endswith("**Available Tools:** scan_ports")
+
+
+class TestToolsPromptCache:
+    @pytest.fixture
+    def mcp(self):
+        mcp = MagicMock()
+        mcp.list_all_tools = AsyncMock(
+            return_value=[{"name": "scan_ports", "description": "Scan", "_server": "spc"}]
+        )
+        return mcp
+
+    async def test_tools_are_listed_once_within_ttl(self, mcp):
+        handler = _make_handler(mcp_manager=mcp)
+
+        first = await handler._get_tools_prompt()
+        second = await handler._get_tools_prompt()
+
+        assert first == second
+        assert "Tool: scan_ports (Server: spc)" in first
+        mcp.list_all_tools.assert_awaited_once()
+
+    async def test_expired_entry_is_rebuilt(self, mcp, monkeypatch):
+        handler = _make_handler(mcp_manager=mcp)
+        await handler._get_tools_prompt()
+
+        monkeypatch.setattr("src.services.message_handler._TOOLS_PROMPT_TTL", 0.0)
+        await handler._get_tools_prompt()
+
+        assert mcp.list_all_tools.await_count == 2
+
+    async def test_no_tools_adds_nothing(self):
+        mcp = MagicMock()
+        mcp.list_all_tools = AsyncMock(return_value=[])
+        assert await _make_handler(mcp_manager=mcp)._get_tools_prompt() == ""
+
+
+class TestSystemPromptCache:
+    def test_prompt_is_reused_until_tools_section_changes(self):
+        handler = _make_handler()
+        section = "\n\nAvailable Custom Tools:\nTool: a"
+
+        first = handler._assemble_system_prompt("slack", section)
+        assert first.endswith(section)
+        assert handler._assemble_system_prompt("slack", section) is first
+
+        rebuilt = handler._assemble_system_prompt("slack", "".join([section, "\nTool: b"]))
+        assert rebuilt is not first and rebuilt.endswith("Tool: b")
+
+    def test_channels_are_cached_separately(self):
+        handler = _make_handler()
+        slack = handler._assemble_system_prompt("slack", "")
+        telegram = handler._assemble_system_prompt("telegram", "")
+        assert "Slack" in slack and "Telegram" in telegram
+
+
+class TestK8sCommandHelp:
+    @pytest.mark.parametrize("args", [[], ["help"]])
+    async def test_help_is_returned_without_running_kubectl(self, args):
+        handler = _make_handler()
+        handler._run_kubectl_command = AsyncMock()
+
+        response = await handler._handle_k8s_command(args)
+
+        assert response.startswith("🔧 Kubernetes Commands")
+        handler._run_kubectl_command.assert_not_awaited()
+
+    async def test_unknown_subcommand(self):
+        handler = _make_handler()
+        handler._run_kubectl_command = AsyncMock()
+
+        response = await handler._handle_k8s_command(["Bogus"])
+
+        assert response.startswith("❌ Unknown Kubernetes command: bogus")
+        handler._run_kubectl_command.assert_not_awaited()
+
+    async def test_subcommand_errors_are_reported(self):
+        handler = _make_handler()
+        handler._run_kubectl_command = AsyncMock(side_effect=RuntimeError("boom"))
+
+        response = await handler._handle_k8s_command(["Namespaces"])
+
+        assert response.startswith("❌ Error executing Kubernetes command: boom")
+
+
+class TestTailLines:
+    def test_short_text_is_unchanged(self):
+        text = "\n".join(f"line {i}" for i in range(50))
+        assert _tail_lines(text) == text
+
+    def test_long_text_keeps_last_lines_with_total(self):
+        text = "\n".join(f"line {i}" for i in range(120))
+        out = _tail_lines(text, 3)
+        assert (
+            out == "line 117\nline 118\nline 119\n\n(Showing last 3 lines, earlier lines omitted)"
+        )
+
+    def test_matches_split_based_truncation(self):
+        text = "\n".join(str(i) for i in range(51))
+        kept = _tail_lines(text).split("\n\n")[0]
+        assert kept == "\n".join(text.split("\n")[-50:])
+
+
+class TestK8sCommandOutputBounds:
+    async def test_logs_request_only_the_tail_from_kubectl(self):
+        handler = _make_handler()
+        handler._run_kubectl_command = AsyncMock(return_value=(True, "a\nb"))
+
+        response = await handler._handle_k8s_command(["logs", "web-1", "prod"])
+
+        handler._run_kubectl_command.assert_awaited_once_with(
+            ["logs", "web-1", "-n", "prod", "--tail=51"]
+        )
+        assert "```\na\nb\n```" in response
+
+    async def test_config_shows_only_context_names(self):
+        handler = _make_handler()
+        handler._run_kubectl_command = AsyncMock(return_value=(True, "prod\ndev prod"))
+
+        response = await handler._handle_k8s_command(["config"])
+
+        args = handler._run_kubectl_command.await_args.args[0]
+        assert args[:3] == ["config", "view", "-o"] and args[3].startswith("jsonpath=")
+        assert "• Current context: `prod`" in response
+        assert "• Contexts: `dev`, `prod`" in response
+
+
+class TestFixProblemPods:
+    async def test_deletes_run_concurrently_and_report_in_order(self):
+        handler = _make_handler()
+        listing = (
+            "NAMESPACE   NAME    READY   STATUS             RESTARTS   AGE\n"
+            "prod        api-1   0/1     CrashLoopBackOff   9          1h\n"
+            "prod        job-2   0/1     Error              0          1h\n"
+            "dev         web-3   0/1     OOMKilled          3          1h"
+        )
+        active = peak = 0
+
+        async def fake_kubectl(args, use_cache=True):
+            nonlocal active, peak
+            if args[0] == "get":
+                assert not use_cache  # pods are deleted based on this listing
+                return True, listing
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return (args[2] != "job-2"), "deleted"
+
+        handler._run_kubectl_command = fake_kubectl
+
+        response = await handler._fix_problem_pods()
+
+        assert peak == 3
+        assert "2/3 issue(s) fixed" in response
+        assert response.index("prod/api-1") < response.index("dev/web-3")
+        assert "Could not delete `prod/job-2`" in response
+
+
+class TestRedisCacheReuse:
+    def test_wrapper_is_reused_until_client_changes(self, monkeypatch):
+        handler = _make_handler()
+        first, second = MagicMock(), MagicMock()
+        monkeypatch.setattr("src.services.message_handler.get_redis", lambda: first)
+
+        cache = handler._get_redis_cache()
+        assert handler._get_redis_cache() is cache
+        assert cache.client is first
+
+        monkeypatch.setattr("src.services.message_handler.get_redis", lambda: second)
+        assert handler._get_redis_cache().client is second
+
+
+class TestFormatToolResult:
+    @pytest.mark.parametrize(
+        ("result", "expected"),
+        [
+            (_text_result("all good"), "🔒 Cert\n\n**Target:** a.com\n\nall good"),
+            ({"content": []}, "✅ 🔒 Cert completed for a.com (no detailed output)"),
+            ({"content": [{}]}, "🔒 Cert\n\n**Target:** a.com\n\nNo result"),
+            (_text_result("refused", is_error=True), "❌ **🔒 Cert Failed**\n\nrefused"),
+            ({"isError": True}, "❌ Error executing 🔒 Cert on a.com"),
+            (None, "❌ Error executing 🔒 Cert on a.com"),
+        ],
+    )
+    def test_result_shapes(self, result, expected):
+        assert MessageHandler._format_tool_result(result, "🔒 Cert", "a.com") == expected
+
+
+class TestProcessMessagePersistence:
+    @pytest.fixture
+    def turn(self, monkeypatch):
+        events: list[str] = []
+        session_mgr = MagicMock()
+        session_mgr.get_or_create_session = AsyncMock(
+            return_value=MagicMock(
+                conversation_id="c0ffee00-0000-0000-0000-000000000001",
+                user_id="c0ffee00-0000-0000-0000-000000000002",
+            )
+        )
+        session_mgr.touch_session = AsyncMock(side_effect=lambda *a: events.append("touch"))
+        context_builder = MagicMock()
+        context_builder.add_user_message = AsyncMock(
+            side_effect=lambda _conv, content: events.append(f"user:{content}")
+        )
+        context_builder.build_context = AsyncMock(return_value=[])
+        context_builder.add_assistant_message = AsyncMock(
+            side_effect=lambda *a, **k: events.append("save")
+        )
+        model_selector = MagicMock()
+        model_selector.select_model = AsyncMock(return_value="gpt-4o")
+
+        @contextlib.asynccontextmanager
+        async def fake_get_db_session():
+            yield MagicMock()
+            await asyncio.sleep(0)  # a real commit yields to the loop
+            events.append("commit")
+
+        module = "src.services.message_handler"
+        monkeypatch.setattr(f"{module}.get_db_session", fake_get_db_session)
+        monkeypatch.setattr(f"{module}.get_redis", MagicMock)
+        monkeypatch.setattr(f"{module}.SessionManager", lambda *a: session_mgr)
+        monkeypatch.setattr(f"{module}.ContextBuilder", lambda *a: context_builder)
+        monkeypatch.setattr(f"{module}.ModelSelector", lambda *a: model_selector)
+        return events, session_mgr
+
+    def _handler(self, events):
+        handler = _make_handler()
+        handler.ai_client.generate_response = AsyncMock(return_value=("hi!", 3))
+        handler.router.send_message = AsyncMock(side_effect=lambda *a: events.append(a[2]))
+        return handler
+
+    async def test_reply_is_sent_then_committed_before_turn_is_persisted(self, turn):
+        events, _ = turn
+        handler = self._handler(events)
+
+        await handler._process_message(
+            ChannelMessage(content="hello", user_id="U1", channel_type="slack")
+        )
+        await handler.drain()
+
+        assert events == ["user:hello", "hi!", "commit", "save", "touch", "commit"]
+        assert not handler._background_tasks
+        assert not handler._pending_turns
+
+    async def test_back_to_back_messages_are_stored_in_order(self, turn):
+        events, _ = turn
+        handler = self._handler(events)
+
+        for content in ("hello", "again"):
+            await handler._process_message(
+                ChannelMessage(content=content, user_id="U1", channel_type="slack")
+            )
+        await handler.drain()
+
+        # The second user row follows the first reply's row
+        assert events.index("save") < events.index("user:again")
+        assert events.count("save") == 2
+
+    async def test_persist_failure_does_not_reach_the_user(self, turn):
+        events, session_mgr = turn
+        session_mgr.touch_session = AsyncMock(side_effect=RuntimeError("redis down"))
+        handler = self._handler(events)
+
+        await handler._process_message(
+            ChannelMessage(content="hello", user_id="U1", channel_type="slack")
+        )
+        await handler.drain()
+
+        assert events == ["user:hello", "hi!", "commit", "save"]
+
+
+class TestHandleCommand:
+    @pytest.fixture
+    def session_mgr(self, monkeypatch):
+        session_mgr = MagicMock()
+        session_mgr.get_or_create_session = AsyncMock(return_value=MagicMock())
+        session_mgr.clear_session = AsyncMock()
+        session_mgr.opened = 0
+
+        @contextlib.asynccontextmanager
+        async def fake_get_db_session():
+            session_mgr.opened += 1
+            yield MagicMock()
+
+        module = "src.services.message_handler"
+        monkeypatch.setattr(f"{module}.get_db_session", fake_get_db_session)
+        monkeypatch.setattr(f"{module}.get_redis", MagicMock)
+        monkeypatch.setattr(f"{module}.SessionManager", lambda *a: session_mgr)
+        return session_mgr
+
+    async def _reply(self, handler, content):
+        await handler._handle_command(
+            ChannelMessage(content=content, user_id="U1", channel_type="slack")
+        )
+        return handler.router.send_message.call_args.args[2]
+
+    async def test_bang_prefix_routes_like_slash(self, session_mgr):
+        handler = _make_handler()
+
+        assert await self._reply(handler, "!reset") == "Conversation reset! Starting fresh."
+        session_mgr.clear_session.assert_awaited_once_with("slack", "U1")
+        assert session_mgr.opened == 1
+
+    async def test_arguments_follow_the_command(self, session_mgr):
+        handler = _make_handler()
+        handler._handle_k8s_command = AsyncMock(return_value="pods listed")
+
+        assert await self._reply(handler, "/K8S  pods\n-n prod ") == "pods listed"
+        handler._handle_k8s_command.assert_awaited_once_with(["pods", "-n", "prod"])
+
+    async def test_help_does_not_open_a_db_session(self, session_mgr):
+        handler = _make_handler()
+
+        assert (await self._reply(handler, "/help")).strip()
+        assert session_mgr.opened == 0
+        session_mgr.get_or_create_session.assert_not_awaited()
+
+    async def test_model_sets_preference_without_a_conversation(self, session_mgr, monkeypatch):
+        session_mgr.get_user_id = AsyncMock(return_value="user-id")
+        model_selector = MagicMock()
+        model_selector.set_user_model = AsyncMock()
+        monkeypatch.setattr("src.services.message_handler.ModelSelector", lambda *a: model_selector)
+        handler = _make_handler()
+        handler.ai_client.is_model_supported.return_value = True
+
+        assert await self._reply(handler, "/model gpt-4o") == "Model set to: gpt-4o"
+        model_selector.set_user_model.assert_awaited_once_with("user-id", "gpt-4o")
+        session_mgr.get_or_create_session.assert_not_awaited()
+
+    async def test_unknown_command(self, session_mgr):
+        handler = _make_handler()
+
+        assert (await self._reply(handler, "/bogus")).startswith("Unknown command.")
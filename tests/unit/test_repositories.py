@@ -0,0 +1,40 @@
+"""Unit tests for the database repositories against the SQLite test database."""
+
+import pytest
+from sqlalchemy import func, select
+
+from src.database.models import User
+from src.database.repositories import ConversationRepository, UserRepository
+
+
+class TestUserRepository:
+    async def test_get_or_create_reuses_the_existing_user(self, db_session):
+        repo = UserRepository(db_session)
+
+        first = await repo.get_or_create("slack", "U1", "alice")
+        second = await repo.get_or_create("slack", "U1")
+
+        assert second.id == first.id
+        assert await repo.get_by_id(first.id) is first
+
+    @pytest.mark.parametrize("attempt", [1, 2])
+    async def test_committed_rows_do_not_leak_between_tests(self, db_session, attempt):
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 0
+
+        await UserRepository(db_session).create("slack", "U1")
+        await db_session.commit()
+
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 1
+
+
+class TestConversationRepository:
+    async def test_deactivated_conversation_is_no_longer_active(self, db_session):
+        user = await UserRepository(db_session).get_or_create("slack", "U1")
+        repo = ConversationRepository(db_session)
+
+        conversation = await repo.get_or_create_active(user.id, "slack")
+        assert await repo.get_or_create_active(user.id, "slack") is conversation
+
+        await repo.deactivate(conversation.id)
+
+        assert await repo.get_active_by_user(user.id, "slack") is None
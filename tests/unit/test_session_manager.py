@@ -0,0 +1,299 @@
+"""Unit tests for SessionManager's Redis session cache."""
+
+import uuid
+from dataclasses import asdict
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.database.redis import RedisCache
+from src.services.session_manager import (
+    _TOUCH_SESSION_LUA,
+    SessionData,
+    SessionManager,
+    settings,
+)
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+
+def _session_data() -> SessionData:
+    return SessionData(
+        conversation_id=uuid.UUID("c0ffee00-0000-0000-0000-000000000001"),
+        user_id=uuid.UUID("c0ffee00-0000-0000-0000-000000000002"),
+        channel_type="slack",
+        message_count=3,
+        last_activity="2024-01-01T00:00:00+00:00",
+    )
+
+
+@pytest.fixture
+def pipe():
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    return pipe
+
+
+@pytest.fixture
+def cache(pipe):
+    cache = MagicMock()
+    cache.pipeline.return_value = pipe
+    return cache
+
+
+# ── get_or_create_session ──────────────────────────────────────────────────────
+
+
+class TestGetOrCreateSession:
+    async def test_cached_session_is_returned(self, cache):
+        data = _session_data()
+        cache.hgetall = AsyncMock(return_value={k: str(v) for k, v in asdict(data).items()})
+        mgr = SessionManager(cache, MagicMock())
+        mgr.user_repo.get_or_create = AsyncMock()
+
+        assert await mgr.get_or_create_session("slack", "U1") == data
+        mgr.user_repo.get_or_create.assert_not_awaited()
+
+    async def test_partial_hash_is_treated_as_a_miss(self, cache, pipe):
+        data = _session_data()
+        cache.hgetall = AsyncMock(return_value={"message_count": "1", "last_activity": "x"})
+        mgr = SessionManager(cache, MagicMock())
+        mgr.user_repo.get_or_create = AsyncMock(return_value=MagicMock(id=data.user_id))
+        mgr.conversation_repo.get_or_create_active = AsyncMock(
+            return_value=MagicMock(id=data.conversation_id)
+        )
+
+        session = await mgr.get_or_create_session("slack", "U1")
+
+        assert session.conversation_id == data.conversation_id
+        assert session.message_count == 0
+        pipe.execute.assert_awaited_once()  # the full session was cached again
+
+
+# ── _cache_session ────────────────────────────────────────────────────────────
+
+
+class TestCacheSession:
+    async def test_fields_and_ttl_are_sent_in_one_pipeline(self, cache, pipe):
+        mgr = SessionManager(cache, MagicMock())
+
+        await mgr._cache_session("session:slack:U1", _session_data())
+
+        cache.pipeline.assert_called_once_with()
+        pipe.hset.assert_called_once()
+        fields = pipe.hset.call_args.kwargs["mapping"]
+        assert fields["message_count"] == "3"
+        assert fields["channel_type"] == "slack"
+        assert len(fields) == 5
+        pipe.expire.assert_called_once_with("session:slack:U1", settings.session_ttl_seconds)
+        pipe.execute.assert_awaited_once()
+
+
+# ── SessionData ───────────────────────────────────────────────────────────────
+
+
+class TestSessionData:
+    def test_round_trips_through_the_cache_hash(self):
+        data = _session_data()
+        cached = {key: str(value) for key, value in asdict(data).items()}
+
+        assert SessionData.from_cache(cached) == data
+
+
+# ── get_user_id ───────────────────────────────────────────────────────────────
+
+
+class TestGetUserId:
+    async def test_cached_session_skips_the_database(self, cache):
+        data = _session_data()
+        cache.hget = AsyncMock(return_value=str(data.user_id))
+        mgr = SessionManager(cache, MagicMock())
+        mgr.user_repo.get_or_create = AsyncMock()
+
+        assert await mgr.get_user_id("slack", "U1") == data.user_id
+
+        cache.hget.assert_awaited_once_with("session:slack:U1", "user_id")
+        mgr.user_repo.get_or_create.assert_not_awaited()
+
+    async def test_cache_miss_looks_up_only_the_user(self, cache):
+        data = _session_data()
+        cache.hget = AsyncMock(return_value=None)
+        mgr = SessionManager(cache, MagicMock())
+        mgr.user_repo.get_or_create = AsyncMock(return_value=MagicMock(id=data.user_id))
+        mgr.conversation_repo.get_or_create_active = AsyncMock()
+
+        assert await mgr.get_user_id("slack", "U1", "alice") == data.user_id
+
+        mgr.user_repo.get_or_create.assert_awaited_once_with("slack", "U1", "alice")
+        mgr.conversation_repo.get_or_create_active.assert_not_awaited()
+
+
+# ── increment_message_count ───────────────────────────────────────────────────
+
+
+class TestIncrementMessageCount:
+    async def test_uses_hincrby_and_refreshes_ttl_in_one_round_trip(self, cache, pipe):
+        pipe.execute = AsyncMock(return_value=[4, True])
+        mgr = SessionManager(cache, MagicMock())
+
+        assert await mgr.increment_message_count("slack", "U1") == 4
+
+        pipe.hincrby.assert_called_once_with("session:slack:U1", "message_count", 1)
+        pipe.expire.assert_called_once_with("session:slack:U1", settings.session_ttl_seconds)
+        pipe.execute.assert_awaited_once()
+
+
+# ── touch_session ─────────────────────────────────────────────────────────────
+
+
+class TestTouchSession:
+    async def test_bookkeeping_is_one_atomic_script_call(self, cache):
+        data = _session_data()
+        script = AsyncMock(return_value=[str(data.conversation_id), 4])
+        cache.register_script.return_value = script
+        mgr = SessionManager(cache, MagicMock())
+        mgr.conversation_repo.update_activity = AsyncMock()
+
+        assert await mgr.touch_session("slack", "U1") == 4
+
+        cache.register_script.assert_called_once_with(_TOUCH_SESSION_LUA)
+        script.assert_awaited_once()
+        assert script.await_args.kwargs["keys"] == ["session:slack:U1"]
+        assert script.await_args.kwargs["args"][1] == settings.session_ttl_seconds
+        mgr.conversation_repo.update_activity.assert_awaited_once_with(data.conversation_id)
+
+    async def test_expired_session_is_recached_before_counting(self, cache):
+        data = _session_data()
+        cache.register_script.return_value = AsyncMock(return_value=None)
+        mgr = SessionManager(cache, MagicMock())
+        mgr.conversation_repo.update_activity = AsyncMock()
+        mgr.get_or_create_session = AsyncMock(return_value=data)
+        mgr.increment_message_count = AsyncMock(return_value=1)
+
+        assert await mgr.touch_session("slack", "U1") == 1
+
+        mgr.get_or_create_session.assert_awaited_once_with("slack", "U1")
+        mgr.increment_message_count.assert_awaited_once_with("slack", "U1")
+        mgr.conversation_repo.update_activity.assert_awaited_once_with(data.conversation_id)
+
+    async def test_missing_hash_is_recached_in_full_before_counting(self, cache, pipe):
+        data = _session_data()
+        cache.register_script.return_value = AsyncMock(return_value=None)
+        cache.hgetall = AsyncMock(return_value={})
+        pipe.execute = AsyncMock(side_effect=[[5, True], [1, True]])
+        mgr = SessionManager(cache, MagicMock())
+        mgr.user_repo.get_or_create = AsyncMock(return_value=MagicMock(id=data.user_id))
+        mgr.conversation_repo.get_or_create_active = AsyncMock(
+            return_value=MagicMock(id=data.conversation_id, last_activity=MagicMock())
+        )
+        mgr.conversation_repo.update_activity = AsyncMock()
+
+        assert await mgr.touch_session("slack", "U1") == 1
+
+        # The complete hash is written first, then the message is counted on it
+        assert [c[0] for c in pipe.method_calls if c[0] != "execute"] == [
+            "hset",
+            "expire",
+            "hincrby",
+            "expire",
+        ]
+        mapping = pipe.hset.call_args.kwargs["mapping"]
+        assert mapping["conversation_id"] == str(data.conversation_id)
+        assert mapping["user_id"] == str(data.user_id)
+        mgr.conversation_repo.update_activity.assert_awaited_once_with(data.conversation_id)
+
+
+# ── clear_session ─────────────────────────────────────────────────────────────
+
+
+class TestClearSession:
+    async def test_cached_session_needs_only_the_conversation_id(self, cache):
+        data = _session_data()
+        cache.hget = AsyncMock(return_value=str(data.conversation_id))
+        cache.delete = AsyncMock()
+        mgr = SessionManager(cache, MagicMock())
+        mgr.conversation_repo.deactivate = AsyncMock()
+        mgr.get_or_create_session = AsyncMock()
+
+        await mgr.clear_session("slack", "U1")
+
+        cache.hget.assert_awaited_once_with("session:slack:U1", "conversation_id")
+        mgr.get_or_create_session.assert_not_awaited()
+        mgr.conversation_repo.deactivate.assert_awaited_once_with(data.conversation_id)
+        cache.delete.assert_awaited_once_with("session:slack:U1")
+
+    async def test_cache_miss_deactivates_the_active_conversation(self, cache):
+        data = _session_data()
+        cache.hget = AsyncMock(return_value=None)
+        cache.delete = AsyncMock()
+        mgr = SessionManager(cache, MagicMock())
+        mgr.user_repo.get_by_channel_user = AsyncMock(return_value=MagicMock(id=data.user_id))
+        mgr.conversation_repo.get_active_by_user = AsyncMock(
+            return_value=MagicMock(id=data.conversation_id)
+        )
+        mgr.conversation_repo.deactivate = AsyncMock()
+        mgr.get_or_create_session = AsyncMock()
+
+        await mgr.clear_session("slack", "U1")
+
+        mgr.conversation_repo.get_active_by_user.assert_awaited_once_with(data.user_id, "slack")
+        mgr.conversation_repo.deactivate.assert_awaited_once_with(data.conversation_id)
+        mgr.get_or_create_session.assert_not_awaited()
+
+    async def test_unknown_user_creates_nothing(self, cache):
+        cache.hget = AsyncMock(return_value=None)
+        cache.delete = AsyncMock()
+        mgr = SessionManager(cache, MagicMock())
+        mgr.user_repo.get_by_channel_user = AsyncMock(return_value=None)
+        mgr.conversation_repo.deactivate = AsyncMock()
+        mgr.get_or_create_session = AsyncMock()
+
+        await mgr.clear_session("slack", "U1")
+
+        mgr.get_or_create_session.assert_not_awaited()
+        mgr.conversation_repo.deactivate.assert_not_awaited()
+        cache.delete.assert_awaited_once_with("session:slack:U1")
+
+
+# ── RedisCache ────────────────────────────────────────────────────────────────
+
+
+class TestRedisCacheHset:
+    async def test_mapping_is_one_command(self):
+        client = MagicMock()
+        client.hset = AsyncMock(return_value=2)
+
+        added = await RedisCache(client).hset("h", mapping={"a": "1", "b": "2"})
+
+        assert added == 2
+        client.hset.assert_awaited_once_with("h", None, None, mapping={"a": "1", "b": "2"})
+
+    async def test_single_field(self):
+        client = MagicMock()
+        client.hset = AsyncMock(return_value=1)
+
+        await RedisCache(client).hset("h", "a", "1")
+
+        client.hset.assert_awaited_once_with("h", "a", "1", mapping=None)
+
+
+class TestRedisCacheRegisterScript:
+    def test_script_is_registered_once(self):
+        client = MagicMock()
+        cache = RedisCache(client)
+
+        first = cache.register_script("return 1")
+        second = cache.register_script("return 1")
+
+        assert first is second is client.register_script.return_value
+        client.register_script.assert_called_once_with("return 1")
+
+
+class TestRedisCacheHincrby:
+    async def test_forwards_amount(self):
+        client = MagicMock()
+        client.hincrby = AsyncMock(return_value=7)
+
+        assert await RedisCache(client).hincrby("h", "n", 2) == 7
+
+        client.hincrby.assert_awaited_once_with("h", "n", 2)